@@ -0,0 +1,73 @@
+import threading
+from typing import Optional
+from config import Config
+from instrumentation import tracer
+from planCache import PlanCache
+from checkpointStore import create_checkpointer
+
+class App:
+    """Long-lived objects shared by every rerun and request in a process."""
+
+    def __init__(self, config: Config, tools_setup, travel_planner, graph, plan_cache: Optional[PlanCache],
+                 checkpointer=None, editor=None):
+        self.config = config
+        self.tools_setup = tools_setup
+        self.travel_planner = travel_planner
+        self.graph = graph
+        self.plan_cache = plan_cache
+        self.checkpointer = checkpointer
+        self.editor = editor
+
+
+def build_app(config: Config = None, llm=None) -> App:
+    """Build the config, tools, compiled graph and plan cache from scratch.
+
+    Args:
+        config (Config): Optional prebuilt config; loaded from the environment otherwise.
+        llm: Optional chat model to use instead of the configured provider.
+
+    Returns:
+        App: The assembled application objects.
+    """
+    # Imported here: main imports this module, and ToolsSetup pulls in the LLM provider
+    from main import TravelPlanner
+    from toolsSetUp import ToolsSetup
+    from itineraryEditor import ItineraryEditor
+
+    config = config or Config()
+    tracer.configure(config.trace_path, config.trace_enabled)
+    tools_setup = ToolsSetup(config, llm=llm)
+    travel_planner = TravelPlanner(tools_setup)
+    checkpointer = None
+    if config.checkpoint_enabled:
+        checkpointer = create_checkpointer(config.checkpoint_path, config.checkpoint_max_threads)
+    graph = travel_planner.createWorkflow(checkpointer=checkpointer)
+
+    plan_cache = None
+    if config.plan_cache_enabled:
+        plan_cache = PlanCache(
+            config.plan_cache_path,
+            max_entries=config.plan_cache_max_entries,
+            max_age=config.plan_cache_max_age,
+            volatile_max_age=config.plan_cache_volatile_max_age
+        )
+    editor = ItineraryEditor(tools_setup, max_workers=config.edit_workers)
+    return App(config, tools_setup, travel_planner, graph, plan_cache, checkpointer, editor)
+
+
+_app = None
+_app_lock = threading.Lock()
+
+def get_app() -> App:
+    """Return the process-wide App, building it on first use."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = build_app()
+        return _app
+
+def reset_app() -> None:
+    """Drop the cached App so the next get_app() rebuilds it (e.g. after a config change)."""
+    global _app
+    with _app_lock:
+        _app = None
@@ -0,0 +1,279 @@
+"""Headless batch mode: generate trip plans for a file of requests.
+
+Reads trip requests from a JSONL file (one object with a ``prompt`` and an
+optional ``id`` per line) or a CSV file (``prompt`` and optional ``id``
+columns), runs them through the planner graph on a worker pool and appends
+each result to an output JSONL file as soon as it finishes.
+
+Run from the repository root:
+    python batchPlanner.py destinations.jsonl --output plans.jsonl --workers 8
+    python batchPlanner.py destinations.csv --stub-llm        # no API keys needed
+
+Rerunning the same command resumes an interrupted batch: requests that already
+have a successful result in the output file are skipped, and with checkpoints
+enabled a request that was cut off mid-run continues from its last saved step.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Optional
+from config import Config
+from instrumentation import describe_error, tracer
+from itinerary import Itinerary
+from tripIntent import TripIntent
+
+MIN_PLAN_LENGTH = 700
+
+SUMMARY_PROMPT = """
+Based on all the information gathered, provide a COMPLETE travel summary now.
+Don't use tools anymore. Use the information you have to create a comprehensive plan.
+Format your response in clean Markdown with proper headers, lists, and formatting.
+Original request: {prompt}
+"""
+
+def load_requests(path: str) -> List[dict]:
+    """Read ``{"id", "prompt"}`` requests from a JSONL or CSV file.
+
+    Rows without an ``id`` are numbered by their position in the file, so keep
+    the file order stable between a run and its resume.
+
+    Raises:
+        ValueError: If a row has no prompt or an ID appears twice.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    requests, seen = [], set()
+    for n, row in enumerate(rows, start=1):
+        prompt = (row.get("prompt") or "").strip()
+        if not prompt:
+            raise ValueError(f"Request {n} in {path} has no prompt.")
+        request_id = str(row.get("id") or f"row-{n}")
+        if request_id in seen:
+            raise ValueError(f"Duplicate request id {request_id!r} in {path}.")
+        seen.add(request_id)
+        requests.append({"id": request_id, "prompt": prompt})
+    return requests
+
+def completed_ids(path: str, retry_failed: bool = True) -> set:
+    """IDs that already have a result in the output file (only successful ones if ``retry_failed``)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut off by the interruption; that request runs again
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                done.add(record["id"])
+    return done
+
+
+def ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class BatchPlanner:
+    """Runs many trip requests through one shared graph on a thread pool.
+
+    All workers share the graph, its tools, the response cache, the HTTP
+    connection pool and the plan cache, so repeated destinations and FX
+    tables are fetched once per batch rather than once per plan.
+    """
+
+    def __init__(self, graph, tools_setup=None, plan_cache=None, checkpointing: bool = False,
+                 workers: int = 4, recursion_limit: int = 20, editor=None):
+        self.graph = graph
+        self.tools_setup = tools_setup
+        self.plan_cache = plan_cache
+        self.editor = editor
+        self.checkpointing = checkpointing
+        self.workers = max(1, workers)
+        self.recursion_limit = recursion_limit
+
+    def plan(self, request: dict) -> dict:
+        """Generate one plan and return its output record; errors are recorded, not raised."""
+        start = time.perf_counter()
+        record = {"id": request["id"], "prompt": request["prompt"]}
+        intent = TripIntent.from_text(request["prompt"])
+        try:
+            with tracer.run("batch", request_id=request["id"], destination=intent.destination) as run:
+                cached = self.plan_cache.lookup(intent) if self.plan_cache else None
+                if cached:
+                    plan = cached.plan
+                    if self.plan_cache.needs_refresh(cached):
+                        plan = self.plan_cache.refresh(cached, self.tools_setup)
+                    record["source"] = "plan_cache"
+                else:
+                    plan = self._run_graph(request)
+                    if self.plan_cache:
+                        self.plan_cache.store(intent, plan)
+                    record["source"] = "graph"
+                if self.editor is not None:
+                    itinerary = self.editor.build(plan, intent)
+                else:
+                    itinerary = Itinerary.from_plan(plan, intent)
+                summary = run.summary()
+            record.update(status="ok", plan=plan, itinerary=itinerary.to_dict(),
+                          llm_calls=summary["counters"].get("llm_calls", 0),
+                          tool_calls=summary["by_kind"].get("tool", {}).get("count", 0))
+        except Exception as e:
+            record.update(status="error", error=describe_error(e))
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        record["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return record
+
+    @staticmethod
+    def thread_id(request: dict) -> str:
+        """Checkpoint thread for a request; the prompt hash keeps reused ids from other batches apart."""
+        digest = hashlib.sha1(request["prompt"].encode("utf-8")).hexdigest()[:16]
+        return f"batch-{request['id']}-{digest}"
+
+    @staticmethod
+    def _same_request(state, request: dict) -> bool:
+        first = next((m for m in state.values.get("messages", []) if m.type == "human"), None)
+        return first is not None and first.content == request["prompt"]
+
+    def _run_graph(self, request: dict) -> str:
+        config = {"recursion_limit": self.recursion_limit}
+        graph_input = {"messages": [request["prompt"]]}
+        response = None
+        if self.checkpointing:
+            config["configurable"] = {"thread_id": self.thread_id(request)}
+            state = self.graph.get_state(config)
+            if self._same_request(state, request):
+                if state.next:
+                    # Interrupted in a previous batch run: continue from the last checkpoint
+                    graph_input = None
+                else:
+                    # Finished in a previous run that stopped before writing the result
+                    response = state.values
+        if response is None:
+            response = self.graph.invoke(graph_input, config=config)
+        plan = response["messages"][-1].content
+        if len(plan) < MIN_PLAN_LENGTH and self.tools_setup is not None:
+            messages = response["messages"] + [SUMMARY_PROMPT.format(prompt=request["prompt"])]
+            plan = self.tools_setup.router.compose(messages).content
+        return plan
+
+    def run(self, requests: List[dict], output_path: str, retry_failed: bool = True) -> dict:
+        """Plan every request not yet in ``output_path``, appending results as they finish.
+
+        Returns:
+            dict: Throughput statistics for this run.
+        """
+        done = completed_ids(output_path, retry_failed)
+        pending = [r for r in requests if r["id"] not in done]
+        skipped = len(requests) - len(pending)
+        print(f"{len(requests)} requests: {skipped} already done, {len(pending)} to plan with {self.workers} workers")
+
+        latencies, failed, finished = [], 0, 0
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        try:
+            with open(output_path, "a", encoding="utf-8") as out:
+                if out.tell() and not ends_with_newline(output_path):
+                    # Terminate a record cut off by an earlier interruption
+                    out.write("\n")
+                futures = {executor.submit(self.plan, r) for r in pending}
+                while futures:
+                    complete, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in complete:
+                        record = future.result()
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        out.flush()
+                        finished += 1
+                        latencies.append(record["seconds"])
+                        if record["status"] != "ok":
+                            failed += 1
+                        elapsed = time.perf_counter() - start
+                        print(f"[{finished}/{len(pending)}] {record['id']} {record['status']} "
+                              f"in {record['seconds']:.1f}s | {finished / elapsed * 60:.1f} plans/min")
+        except KeyboardInterrupt:
+            print("Interrupted; rerun the same command to resume.")
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            stats = self.stats(len(requests), skipped, finished, failed, latencies, time.perf_counter() - start)
+            print_stats(stats)
+        return stats
+
+    def stats(self, total: int, skipped: int, finished: int, failed: int, latencies: List[float],
+              elapsed: float) -> dict:
+        ordered = sorted(latencies)
+        stats = {
+            "requests": total,
+            "skipped": skipped,
+            "finished": finished,
+            "failed": failed,
+            "wall_seconds": round(elapsed, 1),
+            "plans_per_minute": round(finished / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "p50_seconds": round(statistics.median(ordered), 2) if ordered else None,
+            "p95_seconds": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2) if ordered else None,
+        }
+        if self.tools_setup is not None:
+            stats["response_cache"] = self.tools_setup.cache.stats()
+            stats["model_tiers"] = self.tools_setup.router.tier_stats()
+        if self.plan_cache is not None:
+            stats["plan_cache"] = self.plan_cache.stats()
+        return stats
+
+
+def print_stats(stats: dict) -> None:
+    line = (f"Finished {stats['finished']} plans ({stats['failed']} failed, {stats['skipped']} skipped) "
+            f"in {stats['wall_seconds']}s")
+    if stats["p50_seconds"] is not None:
+        line += (f": {stats['plans_per_minute']} plans/min, "
+                 f"p50 {stats['p50_seconds']}s, p95 {stats['p95_seconds']}s")
+    print(line)
+    for key in ("response_cache", "plan_cache", "model_tiers"):
+        if key in stats:
+            print(f"  {key}: {json.dumps(stats[key])}")
+
+def build_batch_planner(config: Config, workers: int, stub_llm: bool = False) -> BatchPlanner:
+    """Assemble a BatchPlanner around the process-wide app (or the stub pipeline)."""
+    if stub_llm:
+        from planningService import build_graph, stub_config
+        # Fixture data must not end up in the caches the real app reads
+        config = stub_config(config)
+        tracer.configure(config.trace_path, config.trace_enabled)
+        return BatchPlanner(build_graph(config, stub_llm=True), workers=workers)
+    from appFactory import build_app
+    app = build_app(config)
+    return BatchPlanner(app.graph, tools_setup=app.tools_setup, plan_cache=app.plan_cache,
+                        checkpointing=app.checkpointer is not None, workers=workers, editor=app.editor)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL or CSV file of trip requests")
+    parser.add_argument("--output", help="Output JSONL (default: <input>.plans.jsonl)")
+    parser.add_argument("--workers", type=int, help="Override BATCH_WORKERS")
+    parser.add_argument("--limit", type=int, help="Only plan the first N requests")
+    parser.add_argument("--no-retry-failed", action="store_true", help="Skip requests that failed in an earlier run")
+    parser.add_argument("--stub-llm", action="store_true", help="Use the replaying fake model and stub backends")
+    args = parser.parse_args(argv)
+
+    config = Config()
+    requests = load_requests(args.input)[:args.limit]
+    output = args.output or os.path.splitext(args.input)[0] + ".plans.jsonl"
+    planner = build_batch_planner(config, args.workers or config.batch_workers, args.stub_llm)
+    try:
+        planner.run(requests, output, retry_failed=not args.no_retry_failed)
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Load test of request coalescing for concurrent identical upstream calls.
+
+N simulated users ask for the current weather, the forecast, an exchange rate
+and an attractions search at the same moment, spread over a few cities. Each
+scenario starts with an empty cache and is run with coalescing off and on,
+counting the requests that reach the local stub backend.
+
+Run from the repository root:
+    python -m benchmarks.coalescing --users 50 --cities 3
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stubServer import StubServer
+from currencyService import CurrencyService
+from httpClient import HttpClient
+from responseCache import ResponseCache
+from searchBroker import SearchBroker
+from weatherService import WeatherService
+
+def build_services(server: StubServer, coalesce: bool, pool_size: int):
+    http = HttpClient(pool_size=pool_size)
+    cache = ResponseCache(coalesce=coalesce)
+    weather = WeatherService("stub", cache=cache, http_client=http)
+    weather.BASE_URL = f"{server.url}/data/2.5"
+    currency = CurrencyService(cache=cache, http_client=http)
+    currency.fx_engine.EXCHANGERATE_BASE_URL = f"{server.url}/v4/latest"
+
+    def stub_search(query: str) -> str:
+        return " ".join(http.get(f"{server.url}/search", params={"q": query}).json()["results"])
+
+    broker = SearchBroker(mode="sequential", cache=cache, coalesce=coalesce)
+    broker.add_provider("stub", stub_search)
+    return weather, currency, broker
+
+def run_threaded(server: StubServer, users: int, cities: list, coalesce: bool) -> dict:
+    weather, currency, broker = build_services(server, coalesce, users)
+    start_line = threading.Barrier(users)
+
+    def user(i: int) -> None:
+        city = cities[i % len(cities)]
+        start_line.wait()
+        weather.get_current_weather(city)
+        weather.get_weather_forecast(city, 5)
+        currency.get_exchange_rate("USD", "EUR")
+        broker.search(f"top attractions in {city}")
+
+    server.reset_counters()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user, range(users)))
+    return {"requests": server.requests, "seconds": time.perf_counter() - start}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cities", type=int, default=3, help="Number of distinct destinations")
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub backend latency in seconds")
+    args = parser.parse_args()
+
+    cities = ["Venice", "Kyoto", "Lisbon", "Cusco", "Hanoi", "Oslo"][:max(1, args.cities)]
+    with StubServer(latency=lambda: args.latency) as server:
+        off, on = (run_threaded(server, args.users, cities, c) for c in (False, True))
+        print(f"{args.users} users / {len(cities)} cities: "
+              f"upstream requests {off['requests']} -> {on['requests']} "
+              f"({off['requests'] / max(1, on['requests']):.1f}x fewer), "
+              f"wall time {off['seconds'] * 1000:.0f}ms -> {on['seconds'] * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import json
+import random
+import time
+import uuid
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from tripIntent import TripIntent
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that replays a recorded tool-call sequence.
+
+    A recording is a list of steps; each step is either a list of tool calls
+    (``{"name": ..., "args": {...}}``) or a final ``{"content": ...}`` answer.
+    ``{city}``, ``{days}``, ``{budget_range}``, ``{base}`` and ``{target}``
+    placeholders are filled from the parsed trip intent. Steps whose tool
+    calls already have results in the conversation (e.g. from the prefetch
+    stage) are skipped, as a real model would.
+    """
+
+    steps: List[Any]
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-replay"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "FakeChatModel":
+        with open(path, encoding="utf-8") as f:
+            return cls(steps=json.load(f)["steps"], **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            time.sleep(max(0.0, random.gauss(self.latency, self.latency_jitter)))
+        request = next((m.content for m in messages if isinstance(m, HumanMessage)), "")
+        values = self._placeholders(TripIntent.from_text(request))
+        done = {(m.name, json.dumps(c.get("args"), sort_keys=True))
+                for ai in messages if isinstance(ai, AIMessage) for c in ai.tool_calls
+                for m in messages if isinstance(m, ToolMessage) and m.tool_call_id == c["id"]}
+
+        message = None
+        for step in self.steps:
+            if isinstance(step, dict):
+                message = AIMessage(content=self._fill(step["content"], values))
+                break
+            calls = [{"name": c["name"], "args": self._fill(c["args"], values),
+                      "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"} for c in step]
+            if all((c["name"], json.dumps(c["args"], sort_keys=True)) in done for c in calls):
+                continue
+            message = AIMessage(content="", tool_calls=calls)
+            break
+        if message is None:
+            message = AIMessage(content=self._fill(self.steps[-1]["content"], values))
+
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = max(1, len(str(message.content)) // 4)
+        message.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                  "total_tokens": input_tokens + output_tokens}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _placeholders(intent: TripIntent) -> dict:
+        currencies = intent.currencies or ["USD"]
+        base = intent.budget_currency or currencies[0]
+        target = next((c for c in currencies if c != base), "EUR")
+        return {"city": intent.destination or "Venice", "days": intent.days or 3,
+                "budget_range": intent.budget_band or "mid-range", "base": base, "target": target}
+
+    def _fill(self, value, values: dict):
+        if isinstance(value, str):
+            if value.startswith("{") and value.endswith("}") and value[1:-1] in values:
+                # Keep the placeholder's type, e.g. days stays an int
+                return values[value[1:-1]]
+            return value.format(**values)
+        if isinstance(value, dict):
+            return {k: self._fill(v, values) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._fill(v, values) for v in value]
+        return value
@@ -0,0 +1,48 @@
+"""Measure the latency gained from connection reuse in HttpClient.
+
+Run from the repository root:
+    python -m benchmarks.httpReuse --requests 50 --connect-delay 0.02
+"""
+import argparse
+import statistics
+import time
+import requests
+from httpClient import HttpClient
+from benchmarks.stubServer import StubServer
+
+def measure(call, count: int) -> list:
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = call()
+        response.raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--connect-delay", type=float, default=0.02,
+                        help="Simulated per-connection setup cost in seconds")
+    args = parser.parse_args()
+
+    with StubServer(connect_delay=args.connect_delay) as server:
+        url = f"{server.url}/data/2.5/weather?q=Venice"
+
+        bare = measure(lambda: requests.get(url), args.requests)
+        bare_connections = server.connections
+        server.reset_counters()
+
+        client = HttpClient()
+        pooled = measure(lambda: client.get(url), args.requests)
+        pooled_connections = server.connections
+        client.close()
+
+    for name, timings, connections in (("bare requests.get", bare, bare_connections),
+                                       ("pooled HttpClient", pooled, pooled_connections)):
+        print(f"{name:18} mean={statistics.mean(timings) * 1000:7.2f}ms "
+              f"p50={statistics.median(timings) * 1000:7.2f}ms connections={connections}")
+    print(f"speedup: {statistics.mean(bare) / statistics.mean(pooled):.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Prompt-token count per agent iteration with and without message compaction.
+
+Replays the recorded tool-call sequence without the prefetch stage, so each
+iteration adds another round of large search results, and prints the
+estimated input tokens of every model call.
+
+Run from the repository root:
+    python -m benchmarks.promptGrowth --search-results 60
+"""
+import argparse
+import os
+from benchmarks.fakeChatModel import FakeChatModel
+from benchmarks.runPipeline import FIXTURES, build_planner, load_prompts
+from benchmarks.stubServer import StubServer
+from config import Config
+from instrumentation import tracer
+from main import TravelPlanner
+
+def tokens_per_iteration(compaction: bool, prompt: str, args) -> list:
+    config = Config()
+    config.cache_disk_path = None
+    config.plan_cache_enabled = False
+    config.prefetch_enabled = False
+    config.trace_path = None
+    config.search_index_enabled = False
+    config.compaction_enabled = compaction
+    config.prompt_token_budget = args.token_budget
+
+    with StubServer(search_results=args.search_results) as server:
+        llm = FakeChatModel.from_file(os.path.join(FIXTURES, "recording.json"))
+        tools_setup = build_planner(config, server, llm)
+        tools_setup.cache.clear()
+        graph = TravelPlanner(tools_setup).createWorkflow()
+        with tracer.run("prompt-growth") as run:
+            graph.invoke({"messages": [prompt]}, config={"recursion_limit": 20})
+    llm_spans = sorted((s for s in run.spans if s.kind == "llm"), key=lambda s: s.start)
+    return [s.attrs.get("input_tokens") or 0 for s in llm_spans]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--search-results", type=int, default=60, help="Snippets per stub search result")
+    parser.add_argument("--token-budget", type=int, default=6000)
+    args = parser.parse_args()
+
+    prompt = load_prompts(os.path.join(FIXTURES, "prompts.jsonl"))[0]["prompt"]
+    before = tokens_per_iteration(False, prompt, args)
+    after = tokens_per_iteration(True, prompt, args)
+
+    print(f"{'iteration':>9} {'raw':>8} {'compacted':>10}")
+    for i, (raw, compacted) in enumerate(zip(before, after), start=1):
+        print(f"{i:>9} {raw:>8} {compacted:>10}")
+    print(f"{'total':>9} {sum(before):>8} {sum(after):>10}")
+
+if __name__ == "__main__":
+    main()
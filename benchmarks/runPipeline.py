@@ -0,0 +1,173 @@
+"""Offline end-to-end benchmark of the planning pipeline.
+
+Drives TravelPlanner.createWorkflow() over a corpus of trip prompts with a
+replaying fake chat model and local stand-ins for the weather, FX and search
+backends, so results are comparable across commits without any API keys.
+
+Run from the repository root:
+    python -m benchmarks.runPipeline --repeat 3 --output bench.json
+    python -m benchmarks.runPipeline --compare bench.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from benchmarks.fakeChatModel import FakeChatModel
+from benchmarks.stubServer import StubServer, latency_distribution
+from config import Config
+from instrumentation import tracer
+from main import TravelPlanner
+from searchBroker import SearchBroker
+from toolsSetUp import ToolsSetup
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def load_prompts(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def benchmark_config(args) -> Config:
+    config = Config()
+    config.cache_disk_path = None
+    config.plan_cache_enabled = False
+    config.prefetch_enabled = not args.no_prefetch
+    config.search_index_enabled = args.search_index
+    config.trace_path = None
+    return config
+
+def build_planner(config: Config, server: StubServer, llm: FakeChatModel,
+                  small_llm: FakeChatModel = None) -> ToolsSetup:
+    """Build the real ToolsSetup with its backends pointed at the stub server."""
+    tools_setup = ToolsSetup(config, llm=llm, small_llm=small_llm)
+    tools_setup.weather_service.BASE_URL = f"{server.url}/data/2.5"
+    tools_setup.currency_service.fx_engine.EXCHANGERATE_BASE_URL = f"{server.url}/v4/latest"
+
+    def stub_search(query: str) -> str:
+        response = tools_setup.http_client.get(f"{server.url}/search", params={"q": query})
+        return " ".join(response.json()["results"])
+
+    broker = SearchBroker(mode=config.search_mode, race_width=config.search_race_width,
+                          hedge_delay=config.search_hedge_delay, timeout=config.search_timeout,
+                          cache=tools_setup.cache, coalesce=config.coalesce_requests)
+    for name in ("serpapi", "serper"):
+        broker.add_provider(name, stub_search)
+    broker.add_provider("duckduckgo", stub_search, fallback=True)
+    tools_setup.search_broker = broker
+    return tools_setup
+
+def run_benchmark(args) -> dict:
+    prompts = load_prompts(args.prompts)
+    config = benchmark_config(args)
+    server = StubServer(latency=latency_distribution(args.latency_dist, args.upstream_latency)).start()
+    llm = FakeChatModel.from_file(args.recording, latency=args.llm_latency, latency_jitter=args.llm_latency / 4)
+    small_llm = None
+    if args.small_llm_latency:
+        # The small tier replays the same recording, only faster
+        small_llm = FakeChatModel.from_file(args.recording, latency=args.small_llm_latency,
+                                            latency_jitter=args.small_llm_latency / 4)
+    tools_setup = build_planner(config, server, llm, small_llm)
+    graph = TravelPlanner(tools_setup).createWorkflow()
+
+    results = []
+    try:
+        for _ in range(args.repeat):
+            for item in prompts:
+                if not args.warm_cache:
+                    tools_setup.cache.clear()
+                    tools_setup.currency_service.fx_engine.clear()
+                server.reset_counters()
+                tracemalloc.start()
+                start = time.perf_counter()
+                with tracer.run("benchmark", prompt_id=item["id"]) as run:
+                    graph.invoke({"messages": [item["prompt"]]}, config={"recursion_limit": 20})
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                summary = run.summary()
+                results.append({
+                    "id": item["id"],
+                    "latency_s": elapsed,
+                    "llm_calls": summary["counters"].get("llm_calls", 0),
+                    "large_llm_calls": summary["counters"].get("llm_calls:large", 0),
+                    "tool_calls": summary["by_kind"].get("tool", {}).get("count", 0),
+                    "upstream_requests": server.requests,
+                    "input_tokens": summary["counters"].get("llm_input_tokens", 0),
+                    "peak_alloc_kb": peak / 1024,
+                })
+    finally:
+        server.stop()
+
+    latencies = [r["latency_s"] for r in results]
+    return {
+        "commit": git_commit(),
+        "plans": len(results),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "p50_latency_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p95_latency_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "llm_calls_per_plan": round(statistics.mean(r["llm_calls"] for r in results), 2),
+        "large_llm_calls_per_plan": round(statistics.mean(r["large_llm_calls"] for r in results), 2),
+        "tool_calls_per_plan": round(statistics.mean(r["tool_calls"] for r in results), 2),
+        "upstream_requests_per_plan": round(statistics.mean(r["upstream_requests"] for r in results), 2),
+        "input_tokens_per_plan": round(statistics.mean(r["input_tokens"] for r in results), 1),
+        "peak_alloc_kb": round(max(r["peak_alloc_kb"] for r in results), 1),
+        "runs": results,
+    }
+
+METRICS = ("p50_latency_ms", "p95_latency_ms", "llm_calls_per_plan", "large_llm_calls_per_plan",
+           "tool_calls_per_plan", "upstream_requests_per_plan", "input_tokens_per_plan", "peak_alloc_kb")
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    header = f"commit {report['commit']} - {report['plans']} plans"
+    if baseline:
+        header += f" (vs {baseline['commit']})"
+    print(header)
+    for metric in METRICS:
+        line = f"  {metric:28} {report[metric]:>12}"
+        if baseline and metric in baseline and baseline[metric]:
+            change = (report[metric] - baseline[metric]) / baseline[metric] * 100
+            line += f"   {baseline[metric]:>12}  {change:+6.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", default=os.path.join(FIXTURES, "prompts.jsonl"))
+    parser.add_argument("--recording", default=os.path.join(FIXTURES, "recording.json"))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--small-llm-latency", type=float, default=0.0,
+                        help="Mean latency of a small routing model in seconds (0 disables routing)")
+    parser.add_argument("--upstream-latency", type=float, default=0.08, help="Mean stub backend latency in seconds")
+    parser.add_argument("--latency-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep response caches between plans")
+    parser.add_argument("--no-prefetch", action="store_true", help="Disable the prefetch stage")
+    parser.add_argument("--search-index", action="store_true",
+                        help="Serve repeat city searches from the semantic index (downloads the embedding model)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
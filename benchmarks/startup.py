@@ -0,0 +1,71 @@
+"""Cold-start and rerun latency of the planner's startup path.
+
+Cold start is measured in fresh interpreter processes (imports plus building
+the config, tools and compiled graph). Rerun latency compares rebuilding
+everything on each Streamlit rerun with reusing the cached App.
+
+Run from the repository root:
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+COLD_START = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from appFactory import get_app
+get_app()
+built = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "build_s": built - imported}))
+"""
+
+def cold_start(runs: int, env: dict) -> dict:
+    imports, builds = [], []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", COLD_START], env=env, text=True,
+                                         stderr=subprocess.DEVNULL)
+        result = json.loads(output.strip().splitlines()[-1])
+        imports.append(result["import_s"])
+        builds.append(result["build_s"])
+    return {"import_ms": statistics.median(imports) * 1000, "build_ms": statistics.median(builds) * 1000}
+
+def rerun_latency(runs: int) -> dict:
+    from appFactory import build_app, get_app
+    get_app()
+    rebuild, cached = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        build_app()
+        rebuild.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        get_app()
+        cached.append(time.perf_counter() - start)
+    return {"rebuild_ms": statistics.median(rebuild) * 1000, "cached_ms": statistics.median(cached) * 1000}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # The provider client only needs a key to be constructed; no request is sent
+    env.setdefault("GROQ_API_KEY", "benchmark")
+    env.setdefault("PLAN_CACHE_PATH", os.path.join(".cache", "startup-bench-plans.sqlite"))
+    # Keep the embedding model download out of the measurement
+    env.setdefault("SEARCH_INDEX_ENABLED", "false")
+    os.environ.update({k: env[k] for k in ("GROQ_API_KEY", "PLAN_CACHE_PATH", "SEARCH_INDEX_ENABLED")})
+
+    cold = cold_start(args.runs, env)
+    rerun = rerun_latency(args.runs)
+    print(f"cold start: import {cold['import_ms']:8.1f}ms  build {cold['build_ms']:8.1f}ms")
+    print(f"rerun:      rebuild {rerun['rebuild_ms']:7.1f}ms  cached {rerun['cached_ms']:8.3f}ms")
+
+if __name__ == "__main__":
+    main()
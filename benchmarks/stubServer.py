@@ -0,0 +1,130 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class StubServer:
+    """Local stand-in for the weather, FX and search backends.
+
+    Serves canned JSON over HTTP/1.1 keep-alive on 127.0.0.1. ``latency`` is a
+    callable returning the response delay in seconds, and ``connect_delay``
+    simulates the DNS/TCP/TLS cost paid once per new connection.
+    """
+
+    def __init__(self, latency=None, connect_delay: float = 0.0, search_results: int = 10):
+        self.latency = latency or (lambda: 0.0)
+        self.connect_delay = connect_delay
+        self.search_results = search_results
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+
+    def respond(self, path: str, query: dict):
+        """Return ``(status, payload)`` for a request path."""
+        city = query.get("q", ["Venice"])[0]
+        if path.endswith("/forecast"):
+            return 200, forecast_payload(city, int(query.get("cnt", ["40"])[0]))
+        if path.endswith("/weather"):
+            return 200, {"name": city, "main": {"temp": 24.5, "humidity": 60},
+                         "weather": [{"description": "clear sky"}], "wind": {"speed": 3.1}}
+        if "/latest/" in path:
+            base = path.rsplit("/", 1)[-1].upper()
+            return 200, {"base": base, "rates": rates_table(base)}
+        if path.endswith("/search"):
+            q = query.get("q", [""])[0]
+            return 200, {"results": [f"Result {i} for {q}: lorem ipsum travel guide snippet." for i in range(self.search_results)]}
+        return 404, {"error": "not found"}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+                time.sleep(stub.connect_delay)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(stub.latency())
+                parsed = urlparse(self.path)
+                status, payload = stub.respond(parsed.path, parse_qs(parsed.query))
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+BASE_RATES = {"USD": 1.0, "EUR": 0.92, "JPY": 151.3, "GBP": 0.79, "INR": 83.4, "AUD": 1.52, "CAD": 1.36, "THB": 36.2}
+
+def rates_table(base: str) -> dict:
+    base_rate = BASE_RATES.get(base, 1.0)
+    return {code: rate / base_rate for code, rate in BASE_RATES.items()}
+
+def forecast_payload(city: str, count: int = 40) -> dict:
+    rng = random.Random(city)
+    items = []
+    start = 1754611200  # 2025-08-08 00:00 UTC
+    for i in range(count):
+        dt = start + i * 3 * 3600
+        items.append({
+            "dt": dt,
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt)),
+            "main": {"temp": round(22 + 6 * rng.random(), 1),
+                     "temp_min": round(20 + 4 * rng.random(), 1),
+                     "temp_max": round(26 + 5 * rng.random(), 1)},
+            "weather": [{"description": rng.choice(["clear sky", "few clouds", "light rain"])}],
+            "pop": round(rng.random(), 2),
+            "wind": {"speed": round(2 + 6 * rng.random(), 1)},
+        })
+    return {"city": {"name": city}, "cnt": count, "list": items}
+
+def latency_distribution(kind: str = "fixed", mean: float = 0.05, jitter: float = 0.02):
+    """Build a latency callable: ``fixed``, ``uniform`` or ``lognormal`` around ``mean``."""
+    if kind == "uniform":
+        return lambda: max(0.0, random.uniform(mean - jitter, mean + jitter))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(0, 0.5) * mean
+    return lambda: mean
@@ -0,0 +1,115 @@
+from typing import List, Optional
+import numpy as np
+from pydantic import BaseModel, Field
+
+class CostItem(BaseModel):
+    """One line of an itemized trip cost sheet."""
+
+    category: str = Field(description="Cost category, e.g. accommodation, food, transportation, attractions, extras")
+    amount: float = Field(description="Cost of one unit in the item's currency")
+    currency: str = Field(default="USD", description="ISO currency code of the amount")
+    quantity: float = Field(default=1, description="Number of units, e.g. people or tickets")
+    day: Optional[int] = Field(default=None, description="1-based trip day the cost falls on")
+    daily: bool = Field(default=False, description="True if the cost repeats on every day of the trip")
+    description: Optional[str] = Field(default=None, description="Optional note, e.g. the hotel or restaurant name")
+
+
+class BudgetEngine:
+    """Deterministic cost engine for whole itemized cost sheets.
+
+    All items are converted into the budget currency in one batch using the
+    locally held FX table, then summed into a category x day matrix with
+    NumPy. Totals, per-day budgets and views in other currencies come out of
+    the same pass, so a full expense breakdown costs a single tool call.
+    """
+
+    def __init__(self, currency_service):
+        self.currency_service = currency_service
+
+    def _convert(self, amounts: np.ndarray, from_currencies: List[str], to_currency) -> np.ndarray:
+        if isinstance(to_currency, str) and all(c == to_currency for c in from_currencies):
+            return amounts
+        converted = self.currency_service.convert_many(amounts, from_currencies, to_currency)
+        if converted is None:
+            raise ValueError("Exchange rates are not available for these currencies.")
+        return np.asarray(converted, dtype=np.float64)
+
+    def calculate(self, items: List[CostItem], days: int, currency: str,
+                  display_currencies: Optional[List[str]] = None) -> dict:
+        """Compute totals, per-day budgets and multi-currency views.
+
+        Args:
+            items (List[CostItem]): Itemized costs.
+            days (int): Trip length in days.
+            currency (str): Budget currency all totals are computed in.
+            display_currencies (List[str]): Extra currencies to show the totals in.
+
+        Returns:
+            dict: Categories, the category x day matrix (last column holds costs
+            not tied to a day), totals and per-currency views.
+
+        Raises:
+            ValueError: If days is not positive, a day is out of range, or
+                a conversion is not possible.
+        """
+        if days <= 0:
+            raise ValueError("Days must be greater than zero.")
+        if any(item.day is not None and not 1 <= item.day <= days for item in items):
+            raise ValueError(f"Item days must be between 1 and {days}.")
+        currency = currency.upper()
+        categories = list(dict.fromkeys(item.category.strip().lower() for item in items))
+        category_index = np.array([categories.index(item.category.strip().lower()) for item in items], dtype=np.intp)
+        amounts = np.array([item.amount * item.quantity for item in items], dtype=np.float64)
+        amounts = self._convert(amounts, [item.currency.upper() for item in items], currency)
+
+        daily = np.array([item.daily for item in items], dtype=bool)
+        columns = np.array([days if item.day is None else item.day - 1 for item in items], dtype=np.intp)
+
+        matrix = np.zeros((len(categories), days + 1))
+        dated = ~daily
+        np.add.at(matrix, (category_index[dated], columns[dated]), amounts[dated])
+        matrix[:, :days] += np.bincount(category_index[daily], weights=amounts[daily],
+                                        minlength=len(categories))[:, None]
+
+        category_totals = matrix.sum(axis=1)
+        day_totals = matrix[:, :days].sum(axis=0)
+        total = float(category_totals.sum())
+
+        views = {currency: {"total": round(total, 2), "per_day": round(total / days, 2)}}
+        targets = [c.upper() for c in (display_currencies or []) if c.upper() != currency]
+        if targets:
+            rates = self._convert(np.ones(len(targets)), [currency] * len(targets), targets)
+            for code, rate in zip(targets, rates):
+                views[code] = {"total": round(total * rate, 2), "per_day": round(total * rate / days, 2)}
+
+        return {
+            "currency": currency,
+            "days": days,
+            "categories": categories,
+            "matrix": np.round(matrix, 2).tolist(),
+            "category_totals": np.round(category_totals, 2).tolist(),
+            "day_totals": np.round(day_totals, 2).tolist(),
+            "trip_level_total": round(float(matrix[:, days].sum()), 2),
+            "total": round(total, 2),
+            "per_day": round(total / days, 2),
+            "views": views,
+        }
+
+    @staticmethod
+    def to_markdown(result: dict) -> str:
+        """Render a :meth:`calculate` result as Markdown tables."""
+        currency = result["currency"]
+        days = result["days"]
+        header = ["Category"] + [f"Day {d}" for d in range(1, days + 1)] + ["Whole trip", f"Total ({currency})"]
+        lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+        for name, row, total in zip(result["categories"], result["matrix"], result["category_totals"]):
+            cells = [name.title()] + [f"{v:,.2f}" for v in row] + [f"**{total:,.2f}**"]
+            lines.append("| " + " | ".join(cells) + " |")
+        footer = (["**Total**"] + [f"**{v:,.2f}**" for v in result["day_totals"]]
+                  + [f"**{result['trip_level_total']:,.2f}**", f"**{result['total']:,.2f}**"])
+        lines.append("| " + " | ".join(footer) + " |")
+
+        lines += ["", "| Currency | Total | Per day |", "|---|---|---|"]
+        for code, view in result["views"].items():
+            lines.append(f"| {code} | {view['total']:,.2f} | {view['per_day']:,.2f} |")
+        return "\n".join(lines)
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+def create_checkpointer(path: str, max_threads: int = 0):
+    """Create a durable checkpointer that saves graph state after every node.
+
+    Uses the SQLite saver from ``langgraph-checkpoint-sqlite``. If that package
+    is not installed, falls back to the in-memory saver, which still allows
+    resuming and follow-ups within the same process.
+
+    Args:
+        path (str): SQLite file for the checkpoints.
+        max_threads (int): Keep only this many most recently written threads;
+            older ones are deleted on startup. 0 keeps everything.
+
+    Returns:
+        BaseCheckpointSaver: Checkpointer to pass to ``StateGraph.compile``.
+    """
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        from langgraph.checkpoint.memory import InMemorySaver
+        print("langgraph-checkpoint-sqlite is not installed; checkpoints are kept in memory only.")
+        return InMemorySaver()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    saver = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    if max_threads > 0:
+        try:
+            removed = prune_threads(saver, max_threads)
+            if removed:
+                print(f"Removed {removed} old checkpoint threads.")
+        except sqlite3.Error as e:
+            print(f"Could not prune checkpoints: {e}")
+    return saver
+
+def prune_threads(saver, max_threads: int) -> int:
+    """Delete all but the ``max_threads`` most recently written threads of a SQLite saver.
+
+    Returns:
+        int: Number of threads deleted.
+    """
+    saver.setup()
+    with saver.lock:
+        # rowids only grow, so the largest rowid of a thread marks its latest checkpoint
+        stale = [row[0] for row in saver.conn.execute(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id ORDER BY MAX(rowid) DESC LIMIT -1 OFFSET ?",
+            (max_threads,)
+        )]
+    for thread_id in stale:
+        saver.delete_thread(thread_id)
+    return len(stale)
@@ -12,4 +12,111 @@ class Config:
         self.openweather_api_key = os.getenv('OPENWEATHER_API_KEY')
         self.exchange_rate_api_key = os.getenv('EXCHANGE_RATE_API_KEY')
         self.serpapi_key = os.getenv('SERPAPI_KEY')
-        self.serper_api_key = os.getenv('SERPER_API_KEY')
\ No newline at end of file
+        self.serper_api_key = os.getenv('SERPER_API_KEY')
+
+        # Model tiers (set SMALL_MODEL to an empty value to send every call to the large model)
+        self.large_model = os.getenv('LARGE_MODEL', 'qwen/qwen3-32b')
+        self.small_model = os.getenv('SMALL_MODEL', 'llama-3.1-8b-instant') or None
+        self.small_model_max_tokens = int(os.getenv('SMALL_MODEL_MAX_TOKENS', '1024'))
+
+        # Parallel tools stage
+        self.tool_max_concurrency = int(os.getenv('TOOL_MAX_CONCURRENCY', '5'))
+        self.tool_timeout = float(os.getenv('TOOL_TIMEOUT_SECONDS', '30'))
+        self.tool_timeouts = self._parse_timeouts(os.getenv('TOOL_TIMEOUTS', ''))
+
+        # Response cache (set CACHE_DISK_PATH to an empty value to keep it in memory only)
+        self.cache_max_entries = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+        self.cache_disk_path = os.getenv('CACHE_DISK_PATH', '.cache/responses.sqlite') or None
+        self.cache_ttls = {
+            'current_weather': float(os.getenv('CACHE_TTL_CURRENT_WEATHER', '600')),
+            'weather_forecast': float(os.getenv('CACHE_TTL_WEATHER_FORECAST', '10800')),
+            'exchange_rate': float(os.getenv('CACHE_TTL_EXCHANGE_RATE', '21600')),
+            'search': float(os.getenv('CACHE_TTL_SEARCH', '86400')),
+        }
+
+        # Share one upstream call between concurrent identical requests
+        self.coalesce_requests = os.getenv('COALESCE_REQUESTS', 'true').lower() in ('1', 'true', 'yes')
+
+        # FX engine
+        self.fx_base_currency = os.getenv('FX_BASE_CURRENCY', 'USD')
+        self.fx_refresh_interval = float(os.getenv('FX_REFRESH_INTERVAL_SECONDS', '21600'))
+
+        # Shared HTTP client
+        self.http_connect_timeout = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+        self.http_read_timeout = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+        self.http_max_retries = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+        self.http_backoff_factor = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.3'))
+        self.http_pool_size = int(os.getenv('HTTP_POOL_SIZE', '10'))
+        self.http_max_backoff = float(os.getenv('HTTP_MAX_BACKOFF', '5'))
+
+        # Semantic index over search results, keyed by city
+        self.search_index_enabled = os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.search_index_model = os.getenv('SEARCH_INDEX_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+        self.search_index_top_k = int(os.getenv('SEARCH_INDEX_TOP_K', '5'))
+        self.search_index_max_age = float(os.getenv('SEARCH_INDEX_MAX_AGE_SECONDS', '86400'))
+        self.search_index_chunk_chars = int(os.getenv('SEARCH_INDEX_CHUNK_CHARS', '400'))
+        self.search_index_batch_size = int(os.getenv('SEARCH_INDEX_BATCH_SIZE', '32'))
+
+        # Search broker: race, hedged or sequential
+        self.search_mode = os.getenv('SEARCH_MODE', 'race')
+        self.search_race_width = int(os.getenv('SEARCH_RACE_WIDTH', '2'))
+        self.search_hedge_delay = float(os.getenv('SEARCH_HEDGE_DELAY', '1.0'))
+        self.search_timeout = float(os.getenv('SEARCH_TIMEOUT', '20'))
+
+        # Deterministic prefetch stage before the first model call
+        self.prefetch_enabled = os.getenv('PREFETCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+        # Prompt compaction across agent iterations
+        self.compaction_enabled = os.getenv('COMPACTION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.prompt_token_budget = int(os.getenv('PROMPT_TOKEN_BUDGET', '6000'))
+        self.tool_digest_chars = int(os.getenv('TOOL_DIGEST_CHARS', '600'))
+
+        # Durable checkpoints of graph state for resuming runs and follow-ups
+        self.checkpoint_enabled = os.getenv('CHECKPOINT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.checkpoint_path = os.getenv('CHECKPOINT_PATH', '.cache/checkpoints.sqlite')
+        # Threads beyond this many (oldest first) are deleted at startup; 0 keeps all
+        self.checkpoint_max_threads = int(os.getenv('CHECKPOINT_MAX_THREADS', '200'))
+
+        # Plan cache keyed on normalized trip intent
+        self.plan_cache_enabled = os.getenv('PLAN_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.plan_cache_path = os.getenv('PLAN_CACHE_PATH', '.cache/plans.sqlite')
+        self.plan_cache_max_entries = int(os.getenv('PLAN_CACHE_MAX_ENTRIES', '500'))
+        self.plan_cache_max_age = float(os.getenv('PLAN_CACHE_MAX_AGE', '604800'))
+        self.plan_cache_volatile_max_age = float(os.getenv('PLAN_CACHE_VOLATILE_MAX_AGE', '10800'))
+
+        # Instrumentation: JSON-lines traces and aggregated latency histograms
+        self.trace_enabled = os.getenv('TRACE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        self.trace_path = os.getenv('TRACE_PATH', '.cache/traces.jsonl')
+        self.trace_histogram_path = os.getenv('TRACE_HISTOGRAM_PATH', '.cache/histograms.json')
+
+        # Planning service (set PLANNING_SERVICE_URL to make the UI submit jobs to it)
+        self.service_host = os.getenv('SERVICE_HOST', '127.0.0.1')
+        self.service_port = int(os.getenv('SERVICE_PORT', '8765'))
+        self.service_workers = int(os.getenv('SERVICE_WORKERS', '4'))
+        self.service_queue_size = int(os.getenv('SERVICE_QUEUE_SIZE', '32'))
+        self.service_rate_per_minute = float(os.getenv('SERVICE_RATE_PER_MINUTE', '6'))
+        self.service_burst = int(os.getenv('SERVICE_BURST', '3'))
+        self.planning_service_url = os.getenv('PLANNING_SERVICE_URL')
+
+        # Batch CLI
+        self.batch_workers = int(os.getenv('BATCH_WORKERS', '4'))
+
+        # Incremental plan edits: sections regenerated in parallel
+        self.edit_workers = int(os.getenv('EDIT_WORKERS', '4'))
+
+        # Streamlit UI
+        self.stream_plan = os.getenv('STREAM_PLAN', 'true').lower() in ('1', 'true', 'yes')
+
+    @staticmethod
+    def _parse_timeouts(value: str) -> dict:
+        """Parse per-tool timeouts given as "tool_a=10,tool_b=20"."""
+        timeouts = {}
+        for item in value.split(','):
+            if '=' not in item:
+                continue
+            name, seconds = item.split('=', 1)
+            try:
+                timeouts[name.strip()] = float(seconds)
+            except ValueError:
+                continue
+        return timeouts
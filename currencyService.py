@@ -1,11 +1,12 @@
-import requests
+from fxEngine import FxEngine
 
 class CurrencyService:
-    
-    EXCHANGERATE_BASE_URL = "https://api.exchangerate-api.com/v4/latest"
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache=None, base_currency: str = "USD",
+                 refresh_interval: float = 6 * 60 * 60, http_client=None):
         self.api_key = api_key
+        self.cache = cache
+        self.fx_engine = FxEngine(base_currency, refresh_interval, cache=cache, http_client=http_client)
 
     def get_exchange_rate(self, from_currency: str, to_currency: str) -> float:
         """Get exchange rate from one currency to another.
@@ -17,17 +18,7 @@ class CurrencyService:
         Returns:
             float: Exchange rate or None if an error occurs.
         """
-        try:
-            url = f"{self.EXCHANGERATE_BASE_URL}/{from_currency}"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                return data['rates'].get(to_currency)
-            else:
-                return None
-        except Exception as e:
-            print(f"Error fetching exchange rate: {e}")
-            return None
+        return self.fx_engine.get_rate(from_currency, to_currency)
 
     def convert_currency(self, amount: float, from_currency: str, to_currency: str) -> float:
         """Convert an amount from one currency to another.
@@ -43,4 +34,21 @@ class CurrencyService:
         rate = self.get_exchange_rate(from_currency, to_currency)
         if rate is not None:
             return amount * rate
-        return None
\ No newline at end of file
+        return None
+
+    def convert_many(self, amounts, from_currency, to_currency) -> list:
+        """Convert a batch of amounts using the locally held rates table.
+
+        Args:
+            amounts (list): Amounts to convert.
+            from_currency (str | list): Currency code, or one code per amount.
+            to_currency (str | list): Currency code, or one code per amount.
+
+        Returns:
+            list: Converted amounts or None if an error occurs.
+        """
+        try:
+            return self.fx_engine.convert_many(amounts, from_currency, to_currency).tolist()
+        except (RuntimeError, ValueError) as e:
+            print(f"Error converting amounts: {e}")
+            return None
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+
+class DailyForecast:
+    """Per-day aggregates of a city forecast, one array element per local day."""
+
+    __slots__ = ("dates", "temp_min", "temp_max", "temp_mean", "rain_chance", "rain_mm",
+                 "wind_max", "descriptions", "advisories")
+
+    def __init__(self, dates, temp_min, temp_max, temp_mean, rain_chance, rain_mm, wind_max,
+                 descriptions, advisories):
+        self.dates = dates
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        self.temp_mean = temp_mean
+        self.rain_chance = rain_chance
+        self.rain_mm = rain_mm
+        self.wind_max = wind_max
+        self.descriptions = descriptions
+        self.advisories = advisories
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def to_list(self) -> List[dict]:
+        return [
+            {
+                "date": self.dates[i],
+                "temp_min": round(float(self.temp_min[i]), 1),
+                "temp_max": round(float(self.temp_max[i]), 1),
+                "temp_mean": round(float(self.temp_mean[i]), 1),
+                "rain_chance": int(round(float(self.rain_chance[i]) * 100)),
+                "rain_mm": round(float(self.rain_mm[i]), 1),
+                "wind_max": round(float(self.wind_max[i]), 1),
+                "description": self.descriptions[i],
+                "advisories": self.advisories[i],
+            }
+            for i in range(len(self))
+        ]
+
+
+class CityForecast:
+    """Compact array-backed 3-hourly forecast for one city.
+
+    Built from the OpenWeather ``/forecast`` response; each field is a NumPy
+    array aligned with ``timestamps`` so daily aggregates are computed in
+    vectorized form.
+    """
+
+    __slots__ = ("city", "utc_offset", "timestamps", "temp", "temp_min", "temp_max",
+                 "rain_chance", "rain_mm", "wind", "descriptions")
+
+    RAIN_CHANCE_ADVISORY = 0.5
+    HEAT_ADVISORY = 32.0
+    COLD_ADVISORY = 3.0
+    WIND_ADVISORY = 10.0
+
+    def __init__(self, city: str, utc_offset: int, timestamps, temp, temp_min, temp_max,
+                 rain_chance, rain_mm, wind, descriptions):
+        self.city = city
+        self.utc_offset = utc_offset
+        self.timestamps = timestamps
+        self.temp = temp
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        self.rain_chance = rain_chance
+        self.rain_mm = rain_mm
+        self.wind = wind
+        self.descriptions = descriptions
+
+    @classmethod
+    def from_response(cls, city: str, data: dict) -> Optional["CityForecast"]:
+        """Parse a ``/forecast`` response.
+
+        Args:
+            city (str): City name the forecast was requested for.
+            data (dict): Raw OpenWeather forecast response.
+
+        Returns:
+            CityForecast: Parsed forecast or None if the response has no entries.
+        """
+        items = (data or {}).get("list") or []
+        if not items:
+            return None
+        items = sorted(items, key=lambda item: item["dt"])
+        main = [item.get("main", {}) for item in items]
+        return cls(
+            city=city,
+            utc_offset=int((data.get("city") or {}).get("timezone", 0)),
+            timestamps=np.array([item["dt"] for item in items], dtype=np.int64),
+            temp=np.array([m.get("temp", np.nan) for m in main], dtype=np.float32),
+            temp_min=np.array([m.get("temp_min", m.get("temp", np.nan)) for m in main], dtype=np.float32),
+            temp_max=np.array([m.get("temp_max", m.get("temp", np.nan)) for m in main], dtype=np.float32),
+            rain_chance=np.array([item.get("pop", 0.0) for item in items], dtype=np.float32),
+            rain_mm=np.array([(item.get("rain") or {}).get("3h", 0.0) for item in items], dtype=np.float32),
+            wind=np.array([(item.get("wind") or {}).get("speed", 0.0) for item in items], dtype=np.float32),
+            descriptions=[(item.get("weather") or [{}])[0].get("description", "n/a") for item in items],
+        )
+
+    def daily(self, days: Optional[int] = None) -> DailyForecast:
+        """Aggregate the 3-hourly series into local calendar days.
+
+        Args:
+            days (int): Keep at most this many days.
+
+        Returns:
+            DailyForecast: Min/max/mean temperature, rain chance and amount,
+            maximum wind, a representative description and advisories per day.
+        """
+        local = self.timestamps + self.utc_offset
+        day_index = local // 86400
+        _, starts = np.unique(day_index, return_index=True)
+        if days is not None:
+            starts = starts[:max(1, days)]
+            end = starts[-1] + np.count_nonzero(day_index == day_index[starts[-1]]) if len(starts) else 0
+        else:
+            end = len(local)
+        counts = np.diff(np.append(starts, end))
+
+        temp_min = np.minimum.reduceat(self.temp_min[:end], starts)
+        temp_max = np.maximum.reduceat(self.temp_max[:end], starts)
+        temp_mean = np.add.reduceat(self.temp[:end], starts) / counts
+        rain_chance = np.maximum.reduceat(self.rain_chance[:end], starts)
+        rain_mm = np.add.reduceat(self.rain_mm[:end], starts)
+        wind_max = np.maximum.reduceat(self.wind[:end], starts)
+
+        # Describe each day by the slot closest to local midday
+        hours = (local[:end] % 86400) // 3600
+        midday = np.abs(hours - 12)
+        descriptions = []
+        for start, count in zip(starts, counts):
+            descriptions.append(self.descriptions[start + int(np.argmin(midday[start:start + count]))])
+
+        rainy = rain_chance >= self.RAIN_CHANCE_ADVISORY
+        hot = temp_max >= self.HEAT_ADVISORY
+        cold = temp_min <= self.COLD_ADVISORY
+        windy = wind_max >= self.WIND_ADVISORY
+        advisories = []
+        for i in range(len(starts)):
+            notes = []
+            if rainy[i]:
+                notes.append("high chance of rain, carry an umbrella")
+            if hot[i]:
+                notes.append("heat, stay hydrated and plan indoor breaks")
+            if cold[i]:
+                notes.append("cold, pack warm layers")
+            if windy[i]:
+                notes.append("strong wind")
+            advisories.append(notes)
+
+        dates = [datetime.fromtimestamp(int(local[s]) - int(local[s]) % 86400, tz=timezone.utc).strftime("%Y-%m-%d")
+                 for s in starts]
+        return DailyForecast(dates, temp_min, temp_max, temp_mean, rain_chance, rain_mm, wind_max,
+                             descriptions, advisories)
+
+    def summary(self, days: Optional[int] = None) -> str:
+        """Format the daily aggregates as the text returned to the model."""
+        lines = []
+        for day in self.daily(days).to_list():
+            line = (f"{day['date']}: {day['temp_min']}–{day['temp_max']}°C, {day['description']}, "
+                    f"rain chance {day['rain_chance']}%")
+            if day["rain_mm"]:
+                line += f" ({day['rain_mm']} mm)"
+            line += f", wind up to {day['wind_max']} m/s"
+            if day["advisories"]:
+                line += ". Advisory: " + "; ".join(day["advisories"])
+            lines.append(line)
+        return f"Weather forecast for {self.city}:\n" + "\n".join(lines)
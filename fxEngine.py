@@ -0,0 +1,158 @@
+import threading
+import time
+from typing import Optional, Sequence, Union
+import numpy as np
+from httpClient import HttpClient
+
+class FxEngine:
+    """Local FX engine backed by a single base-currency rates table.
+
+    The full ``/latest/{base}`` table is downloaded once per refresh interval
+    and kept as a float array indexed by currency code. Any A->B rate is then
+    computed locally by triangulating through the base currency, so converting
+    a whole cost breakdown needs no extra HTTP calls.
+
+    The codes, rates and fetch time are swapped in as one tuple, so readers
+    never pair a new code index with an old rates array.
+    """
+
+    EXCHANGERATE_BASE_URL = "https://api.exchangerate-api.com/v4/latest"
+
+    def __init__(self, base_currency: str = "USD", refresh_interval: float = 6 * 60 * 60, cache=None,
+                 http_client: HttpClient = None):
+        """
+        Args:
+            base_currency (str): Currency the rates table is fetched for.
+            refresh_interval (float): Seconds before the table is downloaded again.
+            cache (ResponseCache): Optional shared cache holding the raw table.
+            http_client (HttpClient): Client used to download the table.
+        """
+        self.base_currency = base_currency.upper()
+        self.refresh_interval = refresh_interval
+        self.cache = cache
+        self.http = http_client or HttpClient()
+        self._table = ({}, np.empty(0, dtype=np.float64), 0.0)
+        self._lock = threading.Lock()
+
+    @property
+    def codes(self) -> dict:
+        return self._table[0]
+
+    @property
+    def rates(self) -> np.ndarray:
+        return self._table[1]
+
+    @property
+    def fetched_at(self) -> float:
+        return self._table[2]
+
+    def clear(self) -> None:
+        """Forget the loaded table so the next lookup refreshes it."""
+        with self._lock:
+            self._table = ({}, np.empty(0, dtype=np.float64), 0.0)
+
+    def _fresh(self) -> bool:
+        codes, _, fetched_at = self._table
+        return bool(codes) and time.time() - fetched_at < self.refresh_interval
+
+    def _fetch_table(self) -> Optional[dict]:
+        """Download the table as ``{"rates": ..., "fetched_at": ...}`` so cached copies keep their age."""
+        try:
+            url = f"{self.EXCHANGERATE_BASE_URL}/{self.base_currency}"
+            response = self.http.get(url)
+            if response.status_code == 200:
+                rates = response.json().get('rates')
+                return {"rates": rates, "fetched_at": time.time()} if rates else None
+            else:
+                return None
+        except Exception as e:
+            print(f"Error fetching exchange rates table: {e}")
+            return None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Load the rates table if it is missing or older than the refresh interval.
+
+        Returns:
+            bool: True if a usable table is available.
+        """
+        with self._lock:
+            if not force and self._fresh():
+                return True
+            if self.cache is not None and not force:
+                table = self.cache.get_or_load("exchange_rate", self._fetch_table, self.base_currency)
+            else:
+                table = self._fetch_table()
+                if self.cache is not None:
+                    self.cache.set("exchange_rate", table, self.base_currency)
+            if not table:
+                return bool(self.codes)
+            self._load_cached(table)
+            return True
+
+    def load_table(self, table: dict, fetched_at: Optional[float] = None) -> None:
+        """Replace the rates table with a ``{currency_code: rate_from_base}`` mapping.
+
+        Args:
+            table (dict): Rates from the base currency.
+            fetched_at (float): When the rates were downloaded (default: now).
+        """
+        codes = sorted(table)
+        self._table = (
+            {code: i for i, code in enumerate(codes)},
+            np.array([table[code] for code in codes], dtype=np.float64),
+            fetched_at if fetched_at is not None else time.time(),
+        )
+
+    def _load_cached(self, table: dict) -> None:
+        if "rates" not in table:
+            # Entry written before fetch times were stored: a plain rates mapping
+            table = {"rates": table, "fetched_at": None}
+        self.load_table(table["rates"], table["fetched_at"])
+
+    @staticmethod
+    def _indices(codes: dict, currencies: Union[str, Sequence[str]]) -> np.ndarray:
+        if isinstance(currencies, str):
+            currencies = [currencies]
+        try:
+            return np.array([codes[c.upper()] for c in currencies], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Unsupported currency code: {e.args[0]}")
+
+    def get_rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Get the A->B exchange rate or None if it is not available."""
+        if not self.refresh():
+            return None
+        codes, rates, _ = self._table
+        try:
+            i, j = self._indices(codes, [from_currency, to_currency])
+        except ValueError:
+            return None
+        return float(rates[j] / rates[i])
+
+    def convert_many(self, amounts, from_currency: Union[str, Sequence[str]],
+                     to_currency: Union[str, Sequence[str]]) -> np.ndarray:
+        """Convert many amounts in one vectorized pass.
+
+        Args:
+            amounts: Scalar or sequence of amounts.
+            from_currency: One currency code or one code per amount.
+            to_currency: One currency code or one code per amount.
+
+        Returns:
+            np.ndarray: Converted amounts.
+
+        Raises:
+            RuntimeError: If no rates table could be loaded.
+            ValueError: If a currency code is unknown.
+        """
+        if not self.refresh():
+            raise RuntimeError("Exchange rates are not available.")
+        codes, rates, _ = self._table
+        amounts = np.asarray(amounts, dtype=np.float64)
+        from_rates = rates[self._indices(codes, from_currency)]
+        to_rates = rates[self._indices(codes, to_currency)]
+        if isinstance(from_currency, str):
+            from_rates = from_rates[0]
+        if isinstance(to_currency, str):
+            to_rates = to_rates[0]
+        return amounts * (to_rates / from_rates)
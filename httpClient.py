@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from instrumentation import describe_error, tracer
+
+class HttpClient:
+    """Shared HTTP client for all outbound service calls.
+
+    Wraps one ``requests.Session`` so connections are pooled and kept alive
+    per host, applies connect/read timeouts to every request, and retries
+    429/5xx responses and connection errors with jittered exponential backoff.
+    Read timeouts are not retried.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 max_retries: int = 2, backoff_factor: float = 0.3, pool_size: int = 10,
+                 max_backoff: float = 5.0):
+        """
+        Args:
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait for the response.
+            max_retries (int): Retries after the first attempt.
+            backoff_factor (float): Base delay in seconds, doubled per retry.
+            pool_size (int): Keep-alive connections kept per host.
+            max_backoff (float): Longest wait between attempts, including a server's Retry-After.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                # A long Retry-After would hold a tool thread past its timeout
+                return min(float(retry_after), self.max_backoff)
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_factor * (2 ** attempt), self.max_backoff))
+
+    def get(self, url: str, params: dict = None, **kwargs) -> requests.Response:
+        """Send a GET request with pooling, timeouts and retries.
+
+        Args:
+            url (str): Request URL.
+            params (dict): Optional query parameters.
+
+        Returns:
+            requests.Response: The last response received.
+
+        Raises:
+            requests.RequestException: If every attempt failed without a response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        parsed = urlparse(url)
+        # Query strings carry API keys, so only host and path are traced
+        with tracer.span("http", f"{parsed.netloc}{parsed.path}") as span:
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                span.set(attempts=attempt + 1)
+                try:
+                    response = self.session.get(url, params=params, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    # A read timeout already used the full read budget; retrying it would outlive the tool timeout
+                    if last_attempt or isinstance(e, requests.ReadTimeout):
+                        span.set(error=describe_error(e))
+                        raise
+                    time.sleep(self._backoff(attempt))
+                    continue
+                if response.status_code not in self.RETRY_STATUSES or last_attempt:
+                    span.set(
+                        status=response.status_code,
+                        upstream_ms=round(response.elapsed.total_seconds() * 1000, 2),
+                        response_bytes=len(response.content)
+                    )
+                    tracer.count("http_requests", attempt + 1)
+                    return response
+                time.sleep(self._backoff(attempt, response))
+
+    def post(self, url: str, json: dict = None, **kwargs) -> requests.Response:
+        """Send a POST request once; it is not retried because it may not be idempotent."""
+        kwargs.setdefault("timeout", self.timeout)
+        parsed = urlparse(url)
+        with tracer.span("http", f"{parsed.netloc}{parsed.path}", method="POST") as span:
+            response = self.session.post(url, json=json, **kwargs)
+            span.set(status=response.status_code, response_bytes=len(response.content))
+            tracer.count("http_requests")
+            return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def get_shared_http_client(config) -> HttpClient:
+    """Return the process-wide HTTP client shared by all services."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient(
+                connect_timeout=config.http_connect_timeout,
+                read_timeout=config.http_read_timeout,
+                max_retries=config.http_max_retries,
+                backoff_factor=config.http_backoff_factor,
+                pool_size=config.http_pool_size,
+                max_backoff=config.http_max_backoff
+            )
+        return _shared_client
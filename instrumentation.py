@@ -0,0 +1,249 @@
+import bisect
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+QUERY_STRING = re.compile(r"\?[^\s'\"<>)]*")
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+def describe_error(e: BaseException) -> str:
+    """Exception type and message with URL query strings (which may carry API keys) removed."""
+    return f"{type(e).__name__}: {QUERY_STRING.sub('?<redacted>', str(e))}"
+
+class Span:
+    """One timed unit of work: a graph node, an LLM call, a tool or an HTTP request."""
+
+    def __init__(self, kind: str, name: str, run_id: Optional[str], parent_id: Optional[str], attrs: dict):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.name = name
+        self.run_id = run_id
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self.end = None
+        self._perf_start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._perf_start
+        self.end = self.start + self.duration
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "span",
+            "run_id": self.run_id,
+            "span_id": self.id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+            **self.attrs,
+        }
+
+
+class Run:
+    """All spans and counters recorded for one plan generation."""
+
+    def __init__(self, name: str, attrs: dict):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.attrs = dict(attrs)
+        self.root = Span("run", name, self.id, None, attrs)
+        self.spans: List[Span] = []
+        self.counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def critical_path(self) -> List[dict]:
+        """Return the chain of spans that determined the run's wall time.
+
+        Walking backwards from the end of a parent, the span that finished
+        last is on the path, then the last one that finished before it
+        started, and so on; overlapping (parallel) siblings are skipped.
+        The same walk is repeated inside every span on the path.
+        """
+        children = defaultdict(list)
+        for span in self.spans:
+            children[span.parent_id].append(span)
+        path = []
+
+        def walk(parent_id: str, depth: int) -> None:
+            chain = []
+            cutoff = float("inf")
+            for span in sorted(children.get(parent_id, []), key=lambda s: s.end or 0, reverse=True):
+                if (span.end or 0) <= cutoff:
+                    chain.append(span)
+                    cutoff = span.start
+            for span in reversed(chain):
+                path.append({"depth": depth, "kind": span.kind, "name": span.name,
+                             "duration_ms": round((span.duration or 0) * 1000, 2)})
+                walk(span.id, depth + 1)
+
+        walk(self.root.id, 0)
+        return path
+
+    def summary(self) -> dict:
+        by_kind = defaultdict(lambda: {"count": 0, "total_ms": 0.0})
+        for span in self.spans:
+            by_kind[span.kind]["count"] += 1
+            by_kind[span.kind]["total_ms"] += (span.duration or 0) * 1000
+        for totals in by_kind.values():
+            totals["total_ms"] = round(totals["total_ms"], 2)
+        return {
+            "type": "run",
+            "run_id": self.id,
+            "name": self.name,
+            "start": self.root.start,
+            "duration_ms": round((self.root.duration or 0) * 1000, 2),
+            "counters": dict(self.counters),
+            "by_kind": dict(by_kind),
+            "critical_path": self.critical_path(),
+            **self.attrs,
+        }
+
+
+class Histogram:
+    """Latency histogram with fixed millisecond buckets and a window for percentiles."""
+
+    def __init__(self, window: int = 1000):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        self.recent.append(value_ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "p50_ms": round(self.percentile(0.5), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class Tracer:
+    """Records spans for graph runs and exports them as JSON lines.
+
+    Usage::
+
+        with tracer.run("plan", user_input=text):
+            graph.invoke(...)
+
+    Spans opened inside the run (``with tracer.span("tool", name): ...``)
+    are attached to it through context variables, including spans opened on
+    worker threads that received a copy of the context.
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self._lock = threading.Lock()
+
+    def configure(self, path: Optional[str] = None, enabled: bool = True) -> None:
+        self.path = path
+        self.enabled = enabled
+
+    @contextmanager
+    def run(self, name: str = "plan", **attrs):
+        run = Run(name, attrs)
+        run_token = _current_run.set(run)
+        span_token = _current_span.set(run.root)
+        try:
+            yield run
+        finally:
+            run.root.finish()
+            _current_span.reset(span_token)
+            _current_run.reset(run_token)
+            if self.enabled:
+                self._write([s.to_dict() for s in run.spans] + [run.summary()])
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attrs):
+        run = _current_run.get()
+        parent = _current_span.get()
+        span = Span(kind, name, run.id if run else None, parent.id if parent else None, attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=describe_error(e))
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(token)
+            if self.enabled:
+                with self._lock:
+                    self._histograms[f"{kind}:{name}"].add(span.duration * 1000)
+                if run is not None:
+                    run.add(span)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add to a counter of the current run (e.g. cache hits, tokens)."""
+        run = _current_run.get()
+        if run is not None and self.enabled:
+            run.count(name, value)
+
+    def current_run(self) -> Optional[Run]:
+        return _current_run.get()
+
+    def histograms(self) -> Dict[str, dict]:
+        with self._lock:
+            return {key: hist.to_dict() for key, hist in sorted(self._histograms.items())}
+
+    def write_histograms(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.histograms(), f, indent=2)
+
+    def _write(self, records: List[dict]) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            print(f"Error writing trace: {e}")
+
+
+tracer = Tracer()
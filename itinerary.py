@@ -0,0 +1,328 @@
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from tripIntent import CURRENCY_CODES, CURRENCY_SYMBOLS, TripIntent
+
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+\S")
+BOLD_HEADING = re.compile(r"^\*\*[^*]+\*\*:?\s*$")
+DAY_LINE = re.compile(r"^(?:#{1,6}\s*|[-*]\s+)?(?:\*\*)?\s*(?:[^\w\s*]+\s*)?day\s+(\d+)\b", re.IGNORECASE)
+SLOT_NAMES = r"(morning|afternoon|evening|night|breakfast|lunch|dinner)"
+# "Morning: ...", "Lunch (12:30): ..." or a bare "Morning (9am)" label; "Dinner in Burano" is an activity
+SLOT_LINE = re.compile(rf"^{SLOT_NAMES}\b(?:[^:]{{0,25}}:\s*(.*)|\s*(?:\([^)]*\))?\s*)$", re.IGNORECASE)
+WEATHER_LINE = re.compile(r"^(.*?\bweather\b[^:]*:\**\s*)(.*)$", re.IGNORECASE | re.MULTILINE)
+COST = re.compile(
+    r"(?P<symbol>[$€£¥₹])\s?(?P<amount>\d[\d,]*(?:\.\d+)?)"
+    r"|(?P<amount2>\d[\d,]*(?:\.\d+)?)\s?(?P<code>[A-Z]{3})\b"
+)
+DAILY_PRICE = re.compile(r"per day|/\s*day|a day|daily|per person per day", re.IGNORECASE)
+# Cost rows recomputed from the hotel and the days, or totals of other rows
+COST_SKIP_WORDS = ("hotel", "accommodation", "lodging", "stay", "activit", "attraction", "entr", "ticket",
+                   "sightseeing", "museum", "total", "overall", "grand", "remaining", "rate", "category")
+COST_CATEGORIES = (
+    ("food", ("food", "meal", "dining", "restaurant", "breakfast", "lunch", "dinner")),
+    ("transportation", ("transport", "metro", "bus", "taxi", "train", "ferry", "vaporetto", "transfer",
+                        "flight", "airfare", "pass")),
+)
+
+# Heading keywords in the order they are checked, e.g. "Hotel Info and Estimated Cost" is the hotel section
+SECTION_KEYWORDS = (
+    ("itinerary", ("day-wise", "itinerary", "day by day", "day-by-day")),
+    ("weather", ("weather",)),
+    ("hotel", ("hotel", "accommodation", "stay")),
+    ("attractions", ("attraction", "sightseeing", "things to do")),
+    ("restaurants", ("restaurant", "food", "dining")),
+    ("transport", ("transport", "getting around")),
+    ("cost", ("expense", "cost", "budget", "currency")),
+    ("tips", ("tip", "pack", "cloth")),
+    ("summary", ("summary",)),
+    ("destination", ("destination", "duration")),
+)
+
+def _clean(line: str) -> str:
+    """Strip bullets, numbering and bold markers from a Markdown line."""
+    line = re.sub(r"^\s*(?:[-*+]|\d+[.)])\s+", "", line.strip())
+    return line.replace("**", "").strip()
+
+def parse_prices(text: str) -> List[tuple]:
+    """Return every ``(amount, currency)`` price in a line, in order."""
+    prices = []
+    for match in COST.finditer(text):
+        if match.group("symbol"):
+            prices.append((float(match.group("amount").replace(",", "")), CURRENCY_SYMBOLS[match.group("symbol")]))
+        elif match.group("code") in CURRENCY_CODES:
+            prices.append((float(match.group("amount2").replace(",", "")), match.group("code")))
+    return prices
+
+def parse_cost(text: str, default_currency: Optional[str] = None):
+    """Return ``(amount, currency)`` for the first price in a line, or ``(None, None)``."""
+    prices = parse_prices(text)
+    return prices[0] if prices else (None, None)
+
+def parse_cost_items(text: str) -> List[dict]:
+    """Parse the line items of a cost section into :class:`budgetEngine.CostItem` fields.
+
+    Hotel, activity and total rows are skipped because they are derived
+    from the rest of the itinerary. Rows priced per day keep their daily
+    amount so they follow the trip length; other rows keep their total.
+    """
+    items = []
+    for line in text.splitlines():
+        cells = [c.strip() for c in line.strip().strip("|").split("|")] if "|" in line else [line]
+        name = re.split(r":|[$€£¥₹]|\d", _clean(cells[0]), maxsplit=1)[0].strip(" -–(")
+        label = name.lower()
+        prices = parse_prices(line)
+        if not prices or not label or "=" in line or any(word in label for word in COST_SKIP_WORDS):
+            continue
+        daily = bool(DAILY_PRICE.search(line))
+        amount, currency = prices[0] if daily else prices[-1]
+        category = next((name for name, words in COST_CATEGORIES if any(word in label for word in words)), "extras")
+        items.append({"category": category, "amount": amount, "currency": currency, "daily": daily,
+                      "description": name})
+    return items
+
+
+class Activity:
+    """One thing to do in a slot, with its estimated cost if the plan states one."""
+
+    __slots__ = ("name", "cost", "currency")
+
+    def __init__(self, name: str, cost: Optional[float] = None, currency: Optional[str] = None):
+        self.name = name
+        self.cost = cost
+        self.currency = currency
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "cost": self.cost, "currency": self.currency}
+
+
+class Slot:
+    """A part of the day (morning, lunch, evening, ...) and its activities."""
+
+    __slots__ = ("name", "activities")
+
+    def __init__(self, name: str, activities: Optional[List[Activity]] = None):
+        self.name = name
+        self.activities = activities or []
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "activities": [a.to_dict() for a in self.activities]}
+
+
+class DayPlan:
+    """Structured view of one ``Day N`` block of the Markdown plan."""
+
+    __slots__ = ("number", "title", "date", "slots", "weather")
+
+    def __init__(self, number: int, title: str, date: Optional[str] = None, slots: Optional[List[Slot]] = None,
+                 weather: Optional[dict] = None):
+        self.number = number
+        self.title = title
+        self.date = date
+        self.slots = slots or []
+        self.weather = weather
+
+    @classmethod
+    def from_markdown(cls, number: int, text: str) -> "DayPlan":
+        lines = text.splitlines()
+        title = _clean(lines[0]).lstrip("#").strip() if lines else f"Day {number}"
+        slots: List[Slot] = []
+        current = None
+        for raw in lines[1:]:
+            line = _clean(raw).lstrip("#").strip()
+            if not line or WEATHER_LINE.match(line):
+                continue
+            slot = SLOT_LINE.match(re.sub(r"^[^\w]+", "", line))
+            if slot:
+                current = Slot(slot.group(1).lower())
+                slots.append(current)
+                line = (slot.group(2) or "").strip()
+                if not line:
+                    continue
+            elif not re.match(r"^\s*(?:[-*+]|\d+[.)])\s+", raw):
+                continue
+            if current is None:
+                current = Slot("day")
+                slots.append(current)
+            cost, currency = parse_cost(line)
+            current.activities.append(Activity(line, cost, currency))
+        return cls(number, title, slots=slots)
+
+    def costs(self) -> List[Activity]:
+        return [a for slot in self.slots for a in slot.activities if a.cost is not None]
+
+    def to_dict(self) -> dict:
+        return {
+            "number": self.number,
+            "title": self.title,
+            "date": self.date,
+            "slots": [s.to_dict() for s in self.slots],
+            "weather": self.weather,
+        }
+
+
+class Itinerary:
+    """Structured itinerary kept alongside the Markdown plan it was parsed from.
+
+    The plan is split into ordered blocks, one per top-level section
+    (``weather``, ``hotel``, ``cost``, ...) and one per ``day:N``. Joining
+    the blocks reproduces the Markdown exactly, so an edit can replace a
+    few blocks and leave the rest of the plan byte-for-byte unchanged.
+    """
+
+    def __init__(self, city: Optional[str], intent: dict, blocks: List[list], forecast: Optional[List[dict]] = None,
+                 hotel: Optional[dict] = None, costs: Optional[List[dict]] = None):
+        self.city = city
+        self.intent = intent
+        self.blocks = blocks
+        self.forecast = forecast or []
+        self.hotel = hotel or {}
+        self.costs = costs or []
+        self.days: Dict[int, DayPlan] = {}
+        for key, text in blocks:
+            if key.startswith("day:"):
+                self._parse_day(key, text)
+
+    @classmethod
+    def from_plan(cls, plan: str, intent: TripIntent, forecast: Optional[List[dict]] = None) -> "Itinerary":
+        """Parse a Markdown plan into sections and days.
+
+        Args:
+            plan (str): The Markdown plan.
+            intent (TripIntent): Parsed trip request (destination, dates, budget).
+            forecast (List[dict]): Daily forecast rows (``DailyForecast.to_list()``) to attach to days.
+        """
+        itinerary = cls(intent.destination, intent.to_dict(), split_blocks(plan), forecast)
+        hotel_cost, hotel_currency = parse_cost(itinerary.section("hotel") or "")
+        itinerary.hotel = {
+            "name": None,
+            "price": hotel_cost if hotel_cost is not None else intent.nightly_budget,
+            "currency": hotel_currency or intent.budget_currency,
+        }
+        itinerary.costs = parse_cost_items(itinerary.section("cost") or "")
+        return itinerary
+
+    def _parse_day(self, key: str, text: str) -> None:
+        number = int(key.split(":", 1)[1])
+        day = DayPlan.from_markdown(number, text)
+        day.date = self.date_of(number)
+        day.weather = self.weather_for(number)
+        self.days[number] = day
+
+    def date_of(self, number: int) -> Optional[str]:
+        start = self.intent.get("start_date")
+        if not start:
+            return None
+        return (date.fromisoformat(start) + timedelta(days=number - 1)).isoformat()
+
+    def weather_for(self, number: int) -> Optional[dict]:
+        """Forecast row for a trip day, matched by date when the start date is known."""
+        day_date = self.date_of(number)
+        if day_date is not None:
+            return next((row for row in self.forecast if row["date"] == day_date), None)
+        return self.forecast[number - 1] if 0 < number <= len(self.forecast) else None
+
+    @property
+    def day_count(self) -> int:
+        return max(self.days, default=0)
+
+    @property
+    def trip_days(self) -> int:
+        """Trip length: the requested days, or the days planned if there are more."""
+        return max(self.day_count, self.intent.get("days") or 0, 1)
+
+    @property
+    def nights(self) -> int:
+        """Hotel nights: one fewer than the trip days, but at least one."""
+        return max(self.trip_days - 1, 1)
+
+    def section(self, key: str) -> Optional[str]:
+        return next((text for k, text in self.blocks if k == key), None)
+
+    def set_block(self, key: str, text: str) -> None:
+        """Replace a block, or insert a new day after the last day block."""
+        for block in self.blocks:
+            if block[0] == key:
+                block[1] = text
+                break
+        else:
+            positions = [i for i, (k, _) in enumerate(self.blocks) if k.startswith("day:")]
+            at = positions[-1] + 1 if positions else len(self.blocks)
+            self.blocks.insert(at, [key, text])
+        if key.startswith("day:"):
+            self._parse_day(key, text)
+
+    def remove_block(self, key: str) -> None:
+        self.blocks = [b for b in self.blocks if b[0] != key]
+        if key.startswith("day:"):
+            self.days.pop(int(key.split(":", 1)[1]), None)
+
+    def to_markdown(self) -> str:
+        return "".join(text for _, text in self.blocks)
+
+    def to_dict(self) -> dict:
+        return {
+            "city": self.city,
+            "intent": self.intent,
+            "hotel": self.hotel,
+            "costs": self.costs,
+            "sections": [key for key, _ in self.blocks],
+            "days": [self.days[n].to_dict() for n in sorted(self.days)],
+        }
+
+
+def _heading_level(line: str) -> Optional[int]:
+    match = MARKDOWN_HEADING.match(line)
+    if match:
+        return len(match.group(1))
+    return 7 if BOLD_HEADING.match(line) else None
+
+def _section_key(line: str) -> Optional[str]:
+    lowered = line.lower()
+    for key, words in SECTION_KEYWORDS:
+        if any(word in lowered for word in words):
+            return key
+    return None
+
+def split_blocks(plan: str) -> List[list]:
+    """Split a Markdown plan into ``[key, text]`` blocks that join back to the original text.
+
+    Section headings start a block keyed by their topic. ``Day N`` headings,
+    and ``Day N`` bullets or bold lines inside the itinerary, start a
+    ``day:N`` block. Slot labels and deeper headings stay in the block
+    they appear in.
+    """
+    blocks: List[list] = [["preamble", ""]]
+    level = 0
+    used = set()
+
+    def start(key: str, line: str, heading_level: int) -> None:
+        nonlocal level
+        if key in used:
+            key = f"{key}-{len(blocks)}"
+        used.add(key)
+        blocks.append([key, line])
+        level = heading_level
+
+    for line in plan.splitlines(keepends=True):
+        stripped = line.strip()
+        current = blocks[-1][0]
+        heading_level = _heading_level(stripped)
+        day = DAY_LINE.match(stripped)
+        in_itinerary = current == "itinerary" or current.startswith("day:")
+        if day and f"day:{int(day.group(1))}" not in used and (
+                (heading_level is not None and heading_level < 7) or in_itinerary):
+            start(f"day:{int(day.group(1))}", line, heading_level or 7)
+            continue
+        if heading_level is not None and not SLOT_LINE.match(_clean(stripped).lstrip("#").strip()):
+            section = _section_key(stripped)
+            if current.startswith("day:"):
+                ends = heading_level < level or (heading_level == level and section is not None)
+            elif current == "preamble" or current.startswith("section-"):
+                ends = current == "preamble" or heading_level <= level or section is not None
+            else:
+                ends = heading_level <= level
+            if ends:
+                start(section or f"section-{len(blocks)}", line, heading_level)
+                continue
+        blocks[-1][1] += line
+    return [b for b in blocks if b[0] != "preamble" or b[1]]
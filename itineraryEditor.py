@@ -0,0 +1,290 @@
+import copy
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from budgetEngine import CostItem
+from instrumentation import tracer
+from itinerary import DAY_LINE, WEATHER_LINE, Itinerary
+from tripIntent import TripIntent
+
+DAY_PROMPT = """Rewrite Day {number} of a {days}-day trip to {city}.
+Change requested: {request}
+Weather that day: {weather}
+Current plan for the day:
+{current}
+
+Other days already cover: {other_days}
+Research notes for {city}:
+{context}
+
+Reply with only the Markdown for this day. Start with the heading line "{heading}", keep
+Morning / Afternoon / Evening slots, and give an estimated cost for each paid activity."""
+
+HOTEL_PROMPT = """Rewrite the hotel section of a {days}-day ({nights}-night) trip plan for {city}.
+Change requested: {request}
+Current section:
+{current}
+
+Hotel search results:
+{context}
+
+Reply with only the Markdown for this section. Start with the heading line "{heading}" and state
+the price per night and the total for {nights} nights."""
+
+
+class PlanChange:
+    """A structured edit to an existing plan.
+
+    Kinds:
+        swap_days: exchange the content of days ``days[0]`` and ``days[1]``.
+        replan_day: rewrite day ``days[0]`` according to ``request``.
+        set_length: make the trip ``length`` days long.
+        set_budget: change the nightly hotel budget to ``price`` ``currency``.
+        set_hotel: stay at ``hotel`` for ``price`` ``currency`` per night.
+    """
+
+    def __init__(self, kind: str, days: Optional[List[int]] = None, request: str = "", length: Optional[int] = None,
+                 price: Optional[float] = None, currency: Optional[str] = None, hotel: Optional[str] = None):
+        self.kind = kind
+        self.days = days or []
+        self.request = request
+        self.length = length
+        self.price = price
+        self.currency = currency
+        self.hotel = hotel
+
+    @classmethod
+    def from_text(cls, text: str) -> Optional["PlanChange"]:
+        """Recognize a change request such as "swap day 2 and day 4"; None if it is free-form."""
+        text = text.strip()
+        lowered = text.lower()
+        match = re.search(r"swap day (\d+) (?:and|with) day (\d+)", lowered)
+        if match:
+            return cls("swap_days", days=[int(match.group(1)), int(match.group(2))], request=text)
+        match = re.search(r"(?:make it|change it to|only|extend (?:it|the trip) to)\s*(\d+)\s*days?|(\d+)\s*days? instead", lowered)
+        if match:
+            return cls("set_length", length=int(match.group(1) or match.group(2)), request=text)
+        intent = TripIntent.from_text(text)
+        match = re.search(r"(?:stay at|switch (?:the hotel )?to|change (?:the )?hotel to|book)\s+(.+?)\s+(?:for|at)\s", text, re.IGNORECASE)
+        if match and intent.nightly_budget:
+            return cls("set_hotel", hotel=match.group(1).strip(), price=intent.nightly_budget,
+                       currency=intent.budget_currency, request=text)
+        if "budget" in lowered and intent.nightly_budget:
+            return cls("set_budget", price=intent.nightly_budget, currency=intent.budget_currency, request=text)
+        match = re.search(r"(?:replace|redo|change|update|rework|replan|re-plan)\s+(?:the\s+)?day (\d+)", lowered)
+        if match:
+            return cls("replan_day", days=[int(match.group(1))], request=text)
+        return None
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in ("kind", "days", "request", "length", "price", "currency", "hotel")}
+
+
+class ItineraryEditor:
+    """Applies a :class:`PlanChange` by regenerating only the sections it invalidates.
+
+    Swapping days only moves blocks and re-attaches the forecast. Rewritten
+    or added days and a changed hotel each take one focused model call, and
+    those calls run in parallel. The cost section is recomputed locally with
+    the budget engine. Every other block of the Markdown stays as it is, so
+    the time an edit takes grows with the number of changed sections, not
+    with the length of the trip.
+    """
+
+    def __init__(self, tools_setup, max_workers: int = 4):
+        self.tools_setup = tools_setup
+        self.tools_by_name = {t.name: t for t in tools_setup.tools}
+        self.max_workers = max(1, max_workers)
+
+    def build(self, plan: str, intent: TripIntent) -> Itinerary:
+        """Parse a freshly generated plan and attach the (cached) daily forecast."""
+        forecast = []
+        if intent.destination:
+            city_forecast = self.tools_setup.weather_service.get_city_forecast(intent.destination, 5)
+            if city_forecast is not None:
+                forecast = city_forecast.daily(5).to_list()
+        return Itinerary.from_plan(plan, intent, forecast)
+
+    def invalidated(self, itinerary: Itinerary, change: PlanChange) -> List[str]:
+        """Return the keys of the blocks a change makes stale."""
+        if change.kind in ("swap_days", "replan_day"):
+            keys = [f"day:{n}" for n in change.days]
+        elif change.kind == "set_length":
+            current = itinerary.day_count
+            low, high = sorted((current, change.length))
+            keys = [f"day:{n}" for n in range(low + 1, high + 1)]
+            # The hotel section states the number of nights and their total
+            keys += ["hotel", "cost"] if itinerary.section("hotel") is not None else ["cost"]
+        else:
+            keys = ["hotel", "cost"]
+        return keys
+
+    def apply(self, itinerary: Itinerary, change: PlanChange) -> Itinerary:
+        """Return a new itinerary with the change applied.
+
+        Raises:
+            ValueError: If the change refers to days the plan does not have,
+                or asks for a trip shorter than one day.
+        """
+        if change.kind == "set_length" and (change.length or 0) < 1:
+            raise ValueError("A trip needs at least one day.")
+        keys = self.invalidated(itinerary, change)
+        with tracer.span("edit", change.kind, sections=len(keys)):
+            updated = copy.deepcopy(itinerary)
+            missing = [n for n in change.days if n not in updated.days]
+            if missing:
+                raise ValueError(f"The plan has no day {missing[0]}.")
+
+            if change.kind == "swap_days":
+                self._swap(updated, *change.days)
+            elif change.kind == "replan_day":
+                self._compose(updated, [(change.days[0], change.request)])
+            elif change.kind == "set_length":
+                self._set_length(updated, change)
+            else:
+                updated.hotel = {"name": change.hotel or updated.hotel.get("name"),
+                                 "price": change.price, "currency": change.currency or updated.hotel.get("currency")}
+                self._compose(updated, [], hotel_request=change.request)
+
+            if "cost" in keys:
+                self._recompute_costs(updated)
+        tracer.count("edited_sections", len(keys))
+        return updated
+
+    def _swap(self, itinerary: Itinerary, a: int, b: int) -> None:
+        text_a, text_b = itinerary.section(f"day:{a}"), itinerary.section(f"day:{b}")
+        itinerary.set_block(f"day:{a}", self._renumber(itinerary, text_b, b, a))
+        itinerary.set_block(f"day:{b}", self._renumber(itinerary, text_a, a, b))
+
+    def _renumber(self, itinerary: Itinerary, text: str, old: int, new: int) -> str:
+        """Move a day block to another day number and refresh its weather line."""
+        heading, _, body = text.partition("\n")
+        match = DAY_LINE.match(heading.strip())
+        if match:
+            start = heading.index(match.group(1), heading.lower().index("day"))
+            heading = heading[:start] + str(new) + heading[start + len(match.group(1)):]
+        weather = itinerary.weather_for(new)
+        if weather is not None:
+            body = WEATHER_LINE.sub(lambda m: m.group(1) + format_weather(weather), body, count=1)
+        return heading + "\n" + body if body or text.endswith("\n") else heading
+
+    def _set_length(self, itinerary: Itinerary, change: PlanChange) -> None:
+        current = itinerary.day_count
+        for number in range(change.length + 1, current + 1):
+            itinerary.remove_block(f"day:{number}")
+        added = [(n, "New day added to the trip; plan a full day that does not repeat the other days.")
+                 for n in range(current + 1, change.length + 1)]
+        itinerary.intent = {**itinerary.intent, "days": change.length}
+        self._compose(itinerary, added, hotel_request=f"The trip is now {change.length} days long; "
+                                                      f"update the number of nights and the hotel total.")
+
+    def _compose(self, itinerary: Itinerary, days: List[tuple], hotel_request: Optional[str] = None) -> None:
+        """Regenerate the given days (and the hotel section) with one model call each, in parallel.
+
+        Each job gathers its own research and builds its prompt on a pool
+        thread, so the searches for several days run concurrently too.
+        """
+        jobs = [(f"day:{n}", lambda n=n, request=request: self._day_prompt(itinerary, n, request))
+                for n, request in days]
+        if hotel_request is not None and itinerary.section("hotel") is not None:
+            jobs.append(("hotel", lambda: self._hotel_prompt(itinerary, hotel_request)))
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            results = list(pool.map(lambda job: self._generate(*job), jobs))
+        for (key, _), text in zip(jobs, results):
+            itinerary.set_block(key, text)
+
+    def _generate(self, key: str, build_prompt) -> str:
+        with tracer.span("compose", key):
+            prompt = build_prompt()
+            content = self.tools_setup.router.compose([prompt]).content.strip()
+        return content + "\n\n"
+
+    def _research(self, tool_name: str, **args) -> str:
+        tool = self.tools_by_name.get(tool_name)
+        if tool is None:
+            return ""
+        try:
+            return str(tool.invoke(args))[:1500]
+        except Exception as e:
+            print(f"Edit research failed: {e}")
+            return ""
+
+    def _day_heading(self, itinerary: Itinerary, number: int) -> str:
+        existing = itinerary.section(f"day:{number}")
+        if existing:
+            return existing.splitlines()[0].strip()
+        last = itinerary.section(f"day:{itinerary.day_count}") if itinerary.day_count else None
+        if last:
+            heading = last.splitlines()[0].strip()
+            prefix = re.match(r"^[#*\-\s]*", heading).group(0)
+            return f"{prefix}Day {number}"
+        return f"### Day {number}"
+
+    def _day_prompt(self, itinerary: Itinerary, number: int, request: str) -> str:
+        city = itinerary.city or "the destination"
+        others = [day.title for n, day in sorted(itinerary.days.items()) if n != number]
+        context = "\n".join(filter(None, (
+            self._research("search_attractions", city=city),
+            self._research("search_restaurants", city=city),
+        )))
+        weather = itinerary.weather_for(number)
+        return DAY_PROMPT.format(
+            number=number, days=max(itinerary.trip_days, number), city=city,
+            request=request, weather=format_weather(weather) if weather else "not available",
+            current=itinerary.section(f"day:{number}") or "(new day)", other_days="; ".join(others) or "nothing yet",
+            context=context, heading=self._day_heading(itinerary, number)
+        )
+
+    def _hotel_prompt(self, itinerary: Itinerary, request: str) -> str:
+        city = itinerary.city or "the destination"
+        hotel = itinerary.hotel
+        price = hotel.get("price")
+        band = TripIntent(nightly_budget=price).budget_band or "mid-range"
+        query_args = {"city": city, "budget_range": band}
+        context = self._research("search_hotels", **query_args)
+        if hotel.get("name"):
+            context = f"Chosen hotel: {hotel['name']} at {price} {hotel.get('currency') or ''} per night.\n" + context
+        current = itinerary.section("hotel")
+        return HOTEL_PROMPT.format(
+            days=itinerary.trip_days, nights=itinerary.nights, city=city, request=request,
+            current=current, context=context, heading=current.splitlines()[0].strip()
+        )
+
+    def _recompute_costs(self, itinerary: Itinerary) -> None:
+        """Re-render the cost section from its line items, the hotel nights and per-activity costs."""
+        current = itinerary.section("cost")
+        days = itinerary.day_count
+        if current is None or days == 0:
+            return
+        currency = itinerary.hotel.get("currency") or itinerary.intent.get("budget_currency") or "USD"
+        items = [CostItem(**item) for item in itinerary.costs]
+        if itinerary.hotel.get("price"):
+            # One night per day except the last, matching the hotel section's total
+            items += [CostItem(category="accommodation", amount=itinerary.hotel["price"], currency=currency,
+                               day=night, description=itinerary.hotel.get("name"))
+                      for night in range(1, min(itinerary.nights, days) + 1)]
+        for number, day in itinerary.days.items():
+            for activity in day.costs():
+                items.append(CostItem(category="activities", amount=activity.cost,
+                                      currency=activity.currency or currency, day=number,
+                                      description=activity.name))
+        if not items:
+            return
+        display = [c for c in itinerary.intent.get("currencies") or [] if c != currency]
+        engine = self.tools_setup.budget_engine
+        try:
+            table = engine.to_markdown(engine.calculate(items, days, currency, display))
+        except ValueError as e:
+            print(f"Could not recompute costs: {e}")
+            return
+        heading = current.splitlines()[0]
+        itinerary.set_block("cost", f"{heading}\n\n{table}\n\n")
+
+
+def format_weather(row: dict) -> str:
+    text = f"{row['description']}, {row['temp_min']}–{row['temp_max']}°C, rain chance {row['rain_chance']}%"
+    if row.get("advisories"):
+        text += " (" + "; ".join(row["advisories"]) + ")"
+    return text
@@ -1,10 +1,18 @@
-from langchain_core.messages import SystemMessage
+import uuid
+from contextlib import nullcontext
+from typing import Optional
+from langchain_core.messages import AIMessage, SystemMessage
 from langgraph.graph import MessagesState, StateGraph, END, START
-from langgraph.prebuilt import ToolNode, tools_condition
-from IPython.display import Markdown
+from langgraph.prebuilt import tools_condition
 import streamlit as st
-from config import Config
 from toolsSetUp import ToolsSetup
+from appFactory import get_app
+from parallelToolNode import ParallelToolNode
+from prefetchStage import PrefetchStage
+from messageCompactor import MessageCompactor
+from tripIntent import TripIntent
+from itineraryEditor import PlanChange
+from instrumentation import tracer
 
 class TravelPlanner:
     def __init__(self, toolsSetUp: ToolsSetup):
@@ -33,6 +41,7 @@ class TravelPlanner:
                - Provide a line-by-line breakdown of expected expenses.
                - Categories: accommodation, food, transportation, attractions, and extras.
                - Clearly state total estimated budget per day and overall.
+               - Put every expense into one calculate_trip_budget call and use its table; do not do the arithmetic yourself.
 
             5. Transport Guidance
               - Include transport modes between places (e.g., metro, taxi, walk).
@@ -53,26 +62,50 @@ class TravelPlanner:
               - Use all available tools to pull real-time weather, location, transport, and pricing data.
               - Ensure calculations (budgets, distances, durations) are accurate.
               - Never guess—if real-time data isn't available, clearly state it and suggest best alternatives.
+              - Weather, attractions, restaurants, hotels, transport and exchange-rate data may already be present as tool results. Use them instead of calling those tools again.
 
               TIP: In the end provide a tip to the user about clothes to wear based on the weather forecast.Which type of shoes to wear, if the climate is rainy carry an umbrella, etc.   
             """
         )
+        config = toolsSetUp.config
+        self.compactor = None
+        if config.compaction_enabled:
+            self.compactor = MessageCompactor(
+                token_budget=config.prompt_token_budget,
+                digest_chars=config.tool_digest_chars
+            )
 
     def call_model(self, state: MessagesState):
         question = state["messages"]    
+        if self.compactor is not None:
+            question = self.compactor.compact(question, MessageCompactor.estimate_tokens([self.system_prompt]))
         question_with_system_prompt = [self.system_prompt] + question   
-        response = self.tools.llm_with_tools.invoke(question_with_system_prompt)
+        with tracer.span("node", "call_model", input_messages=len(question_with_system_prompt)):
+            response = self.tools.router.invoke(question_with_system_prompt)
         
         return {
             "messages": [response]
         }    
 
-    def createWorkflow(self):
+    def createWorkflow(self, checkpointer=None):
         builder = StateGraph(MessagesState) 
         builder.add_node("llm_decision_step", self.call_model)
-        builder.add_node("tools", ToolNode(self.toolsSetUp.tools))
+        config = self.toolsSetUp.config
+        tool_node = ParallelToolNode(
+            self.toolsSetUp.tools,
+            max_concurrency=config.tool_max_concurrency,
+            timeout=config.tool_timeout,
+            timeouts=config.tool_timeouts
+        )
+        builder.add_node("tools", tool_node.as_runnable())
 
-        builder.add_edge(START, "llm_decision_step")
+        if config.prefetch_enabled:
+            ## gather weather, search and FX data in parallel before the first model call
+            builder.add_node("prefetch", PrefetchStage(tool_node).as_runnable())
+            builder.add_edge(START, "prefetch")
+            builder.add_edge("prefetch", "llm_decision_step")
+        else:
+            builder.add_edge(START, "llm_decision_step")
         builder.add_conditional_edges(
             "llm_decision_step",
             ## if last messages is tools call then call the tools
@@ -81,16 +114,135 @@ class TravelPlanner:
         )
         builder.add_edge("tools", "llm_decision_step")
 
-        app = builder.compile()
+        ## with a checkpointer, state is saved after every node so runs can resume
+        app = builder.compile(checkpointer=checkpointer)
         return app
 
 
-if __name__ == "__main__":
-    config = Config()
-    tools_setup = ToolsSetup(config)
+def stream_travel_plan(graph, graph_input: Optional[dict], config: dict) -> dict:
+    """Run the graph in streaming mode and render progress into the page.
+
+    Tool completions are shown in a status box as soon as each tool finishes and
+    the tokens of each model call are written into a placeholder as they arrive.
+    A model call that ends up requesting tools is cleared again, so only the
+    final Markdown plan stays on the page.
+
+    Args:
+        graph: Compiled travel planner graph.
+        graph_input (dict): Graph input, or None to resume from the last checkpoint.
+        config (dict): Run configuration (recursion limit, checkpoint thread).
+
+    Returns:
+        dict: Final graph state.
+    """
+    status = st.status("Planning your trip...", expanded=False)
+    st.subheader("Your Complete Trip Plan:")
+    placeholder = st.empty()
+    plan_text = ""
+    final_state = None
+
+    for mode, chunk in graph.stream(
+        graph_input,
+        config=config,
+        stream_mode=["messages", "custom", "values"]
+    ):
+        if mode == "messages":
+            token, metadata = chunk
+            if metadata.get("langgraph_node") != "llm_decision_step":
+                continue
+            if getattr(token, "tool_call_chunks", None):
+                # This model call selects tools; it is not the final plan
+                plan_text = ""
+                placeholder.empty()
+                continue
+            if isinstance(token.content, str) and token.content:
+                plan_text += token.content
+                placeholder.markdown(plan_text)
+        elif mode == "custom" and chunk.get("event") == "tool_end":
+            icon = "✅" if chunk.get("status") != "error" else "⚠️"
+            status.write(f"{icon} {chunk['name']} ({chunk['finished']}/{chunk['total']})")
+            plan_text = ""
+            placeholder.empty()
+        elif mode == "values":
+            final_state = chunk
+
+    status.update(label="Trip data gathered", state="complete")
+    if final_state is not None:
+        placeholder.markdown(final_state["messages"][-1].content)
+    return final_state
+
+
+def remote_travel_plan(http_client, service_url: str, user_input: str, submit: bool) -> Optional[str]:
+    """Submit the request to the planning service and render its progress.
+
+    The job ID is kept in the session, so a Streamlit rerun resumes polling the
+    in-flight job instead of throwing its work away.
+
+    Returns:
+        str: The final plan, or None if no job is active.
+    """
+    if submit:
+        response = http_client.post(f"{service_url}/jobs", json={
+            "user_id": st.session_state.setdefault("user_id", uuid.uuid4().hex),
+            "prompt": user_input.strip()
+        })
+        if response.status_code >= 400:
+            st.warning(response.json().get("error", "The planner is unavailable."))
+            return None
+        st.session_state["job_id"] = response.json()["job_id"]
 
-    travel_planner = TravelPlanner(tools_setup)
-    graph = travel_planner.createWorkflow()
+    job_id = st.session_state.get("job_id")
+    if job_id is None:
+        return None
+
+    status = st.status("Planning your trip...", expanded=False)
+    st.subheader("Your Complete Trip Plan:")
+    placeholder = st.empty()
+    plan_text = ""
+    after = 0
+    # Long-poll for less than the client's read timeout so a quiet job is not reported as a failure
+    poll_timeout = max(1.0, http_client.timeout[1] - 2)
+    while True:
+        response = http_client.get(f"{service_url}/jobs/{job_id}/events",
+                                   params={"after": after, "timeout": poll_timeout})
+        if response.status_code == 404:
+            st.session_state.pop("job_id", None)
+            return None
+        for event in response.json()["events"]:
+            after += 1
+            if event["type"] == "token":
+                plan_text += event["text"]
+                placeholder.markdown(plan_text)
+            elif event["type"] in ("reset", "tool"):
+                plan_text = ""
+                placeholder.empty()
+                if event["type"] == "tool":
+                    icon = "✅" if event.get("status") != "error" else "⚠️"
+                    status.write(f"{icon} {event['name']} ({event['finished']}/{event['total']})")
+            elif event["type"] == "done":
+                st.session_state.pop("job_id", None)
+                status.update(label="Trip data gathered", state="complete")
+                placeholder.markdown(event["plan"])
+                return event["plan"]
+            elif event["type"] == "error":
+                st.session_state.pop("job_id", None)
+                status.update(label="Planning failed", state="error")
+                raise RuntimeError(event["error"])
+
+
+@st.cache_resource(show_spinner="Starting the travel planner...")
+def load_app():
+    """Build the planner once per process; Streamlit reruns reuse it."""
+    return get_app()
+
+
+if __name__ == "__main__":
+    app = load_app()
+    config = app.config
+    tools_setup = app.tools_setup
+    travel_planner = app.travel_planner
+    graph = app.graph
+    plan_cache = app.plan_cache
 
     limit = {"recursion_limit": 12}
 
@@ -102,47 +254,187 @@ if __name__ == "__main__":
     value=f"Hi, I want to take a 5-day trip to Venice next month 08 August 2025 to 13 August 2025. My hotel budget is around $100 per night. I’d like to know what the weather will be like, what places I can visit, and how much the whole trip might cost. I’ll be paying in Japanese Yen, but my native currency is USD. Also, I prefer local food and public transportation. Can you plan it all for me?."
     )
 
-    
-    if st.button("Generate Trip Plan",type="primary",icon="🔍",use_container_width=True):
-        with st.spinner("Please hold on while I prepare your trip plan..."):
+    stream_output = st.toggle("Stream the plan as it is generated", value=config.stream_plan)
+    generate = st.button("Generate Trip Plan",type="primary",icon="🔍",use_container_width=True)
+
+    ## structured changes (swap days, new hotel, ...) are applied to the itinerary without rerunning the graph
+    change = None
+    if not generate and st.session_state.get("update_plan") and "itinerary" in st.session_state:
+        change = PlanChange.from_text(st.session_state.get("plan_change", ""))
+
+    ## with checkpoints, every plan gets a thread so it can be resumed or followed up
+    run_config = dict(limit)
+    graph_input = {"messages": [user_input.strip()]}
+    resume = follow_up = False
+    if app.checkpointer is not None:
+        if generate:
+            st.session_state["thread_id"] = uuid.uuid4().hex
+            st.session_state.pop("interrupted", None)
+            st.session_state.pop("has_plan", None)
+            st.session_state.pop("itinerary", None)
+        elif st.session_state.get("resume_plan"):
+            resume = True
+            graph_input = None
+        elif change is None and st.session_state.get("update_plan") and st.session_state.get("plan_change", "").strip():
+            follow_up = True
+            graph_input = {"messages": [st.session_state["plan_change"].strip()]}
+        if "thread_id" in st.session_state:
+            run_config["configurable"] = {"thread_id": st.session_state["thread_id"]}
+    run_requested = generate or resume or follow_up
+
+    intent = TripIntent.from_text(user_input)
+    if run_requested:
+        run_trace = tracer.run("plan", destination=intent.destination)
+    elif change is not None:
+        run_trace = tracer.run("edit", destination=intent.destination, change=change.kind)
+    else:
+        run_trace = nullcontext()
+
+    plan_text = None
+    with run_trace as run:
+        cached = plan_cache.lookup(intent) if generate and plan_cache else None
+
+        if change is not None:
+            try:
+                previous = st.session_state["itinerary"]
+                itinerary = app.editor.apply(previous, change)
+                plan_text = itinerary.to_markdown()
+                st.session_state["itinerary"] = itinerary
+                st.subheader("Your Complete Trip Plan:")
+                st.markdown(plan_text)
+                st.caption("Updated sections: " + ", ".join(app.editor.invalidated(previous, change)))
+                if app.checkpointer is not None and "thread_id" in st.session_state:
+                    # Keep the thread in step so later free-form follow-ups see the edited plan
+                    graph.update_state(run_config, {"messages": [AIMessage(content=plan_text)]},
+                                       as_node="llm_decision_step")
+                st.success("Trip plan updated!")
+            except Exception as e:
+                print(f"Edit error: {e}")
+                st.error(f"Could not apply the change: {e}")
+
+        elif cached:
+            plan_text = plan_cache.refresh(cached, tools_setup) if plan_cache.needs_refresh(cached) else cached.plan
+            st.subheader("Your Complete Trip Plan:")
+            st.markdown(plan_text)
+            st.caption("Served from the plan cache. Weather and exchange rates are refreshed from live data.")
+            st.success("Trip plan generated successfully!")
+
+        elif config.planning_service_url and (generate or "job_id" in st.session_state):
+            try:
+                plan_text = remote_travel_plan(tools_setup.http_client, config.planning_service_url, user_input, generate)
+                if plan_text:
+                    if plan_cache:
+                        plan_cache.store(intent, plan_text)
+                    st.success("Trip plan generated successfully!")
+            except Exception as e:
+                print(f"Planning service error: {e}")
+                st.error(f"An error occurred: {e}. Please try again or check your input.")
+
+        elif run_requested and stream_output:
             messages = [user_input.strip()]
             try:
-                response = graph.invoke({"messages": messages}, config=limit)
-                for m in response["messages"]:
-                    m.pretty_print()    
-                #print(result.ai_message.content)
-                # Final check - if still incomplete, force a summary
-                if len(response) < 700:
+                response = stream_travel_plan(graph, graph_input, run_config)
+                final_content = response["messages"][-1].content if response else ""
+                # Final check - if still incomplete, stream a forced summary
+                if len(final_content) < 700:
                     summary_prompt = f"""
                     Based on all the information gathered, provide a COMPLETE travel summary now. 
                     Don't use tools anymore. Use the information you have to create a comprehensive plan.
                     Format your response in clean Markdown with proper headers, lists, and formatting.
                     Original request: {user_input}
                     """
+                    summary_messages = (response["messages"] if response else messages) + [summary_prompt]
+                    final_content = st.write_stream(
+                        chunk.content for chunk in travel_planner.tools.llm.stream(summary_messages)
+                    )
+                plan_text = final_content
+                if plan_cache and not follow_up:
+                    plan_cache.store(intent, final_content)
+                st.session_state["has_plan"] = True
+                st.session_state.pop("interrupted", None)
+                st.success("Trip plan generated successfully!")
+            except Exception as e:
+                print(f"Workflow error: {e}")
+                st.error(f"An error occurred: {e}. Please try again or check your input.")
+                st.session_state["interrupted"] = app.checkpointer is not None
+
+        elif run_requested:
+            with st.spinner("Please hold on while I prepare your trip plan..."):
+                messages = [user_input.strip()]
+                try:
+                    response = graph.invoke(graph_input, config=run_config)
+                    for m in response["messages"]:
+                        m.pretty_print()    
+                    #print(result.ai_message.content)
+                    # Final check - if still incomplete, force a summary
+                    if len(response["messages"][-1].content) < 700:
+                        summary_prompt = f"""
+                        Based on all the information gathered, provide a COMPLETE travel summary now. 
+                        Don't use tools anymore. Use the information you have to create a comprehensive plan.
+                        Format your response in clean Markdown with proper headers, lists, and formatting.
+                        Original request: {user_input}
+                        """
                     
-                    summary_messages = response["messages"] + [summary_prompt]
-                    final_response = travel_planner.tools.llm_with_tools.invoke(summary_messages)
-                    # Safely extract content from final_response
-                    if isinstance(final_response, dict) and "content" in final_response:
-                        print(Markdown(final_response["content"]))
-                        st.subheader("Your Complete Trip Plan:")
-                        st.markdown(final_response["content"]) # Render markdown output
-                        st.success("Trip plan generated successfully!")
-                    elif hasattr(final_response, "content"):
-                        #print(Markdown(final_response.content))
-                        st.subheader("Your Complete Trip Plan:")
-                        st.markdown(final_response.content) # Render markdown output
-                        st.success("Trip plan generated successfully!")
+                        summary_messages = response["messages"] + [summary_prompt]
+                        final_response = travel_planner.tools.router.compose(summary_messages)
+                        # Safely extract content from final_response
+                        if isinstance(final_response, dict) and "content" in final_response:
+                            plan_text = final_response["content"]
+                            print(final_response["content"])
+                            st.subheader("Your Complete Trip Plan:")
+                            st.markdown(final_response["content"]) # Render markdown output
+                            st.success("Trip plan generated successfully!")
+                        elif hasattr(final_response, "content"):
+                            plan_text = final_response.content
+                            #print(final_response.content)
+                            st.subheader("Your Complete Trip Plan:")
+                            st.markdown(final_response.content) # Render markdown output
+                            st.success("Trip plan generated successfully!")
+                        else:
+                            plan_text = final_response['messages'][-1].content
+                            #print(str(final_response))
+                            st.subheader("Your Complete Trip Plan:")
+                            st.markdown(final_response['messages'][-1].content) # Render markdown output
+                            st.success("Trip plan generated successfully!")
                     else:
-                        #print(Markdown(str(final_response)))
+                        plan_text = response['messages'][-1].content
                         st.subheader("Your Complete Trip Plan:")
-                        st.markdown(final_response['messages'][-1].content) # Render markdown output
+                        st.markdown(response['messages'][-1].content) # Render markdown output
                         st.success("Trip plan generated successfully!")
-                else:
-                    st.subheader("Your Complete Trip Plan:")
-                    st.markdown(response['messages'][-1].content) # Render markdown output
-                    st.success("Trip plan generated successfully!")
+                    if plan_cache and not follow_up:
+                        plan_cache.store(intent, plan_text)
+                    st.session_state["has_plan"] = True
+                    st.session_state.pop("interrupted", None)
                 
-            except Exception as e:
-                print(f"Workflow error: {e}")
-                Markdown(f"An error occurred: {e}. Please try again or check your input.")  
\ No newline at end of file
+                except Exception as e:
+                    print(f"Workflow error: {e}")
+                    st.error(f"An error occurred: {e}. Please try again or check your input.")
+                    st.session_state["interrupted"] = app.checkpointer is not None
+
+    ## keep a structured itinerary next to every new plan so later changes can be applied in place
+    if plan_text and change is None:
+        try:
+            st.session_state["itinerary"] = app.editor.build(plan_text, intent)
+        except Exception as e:
+            print(f"Could not parse the plan into an itinerary: {e}")
+            st.session_state.pop("itinerary", None)
+
+    ## resume from the last completed step, or send a follow-up to the same thread
+    has_thread = app.checkpointer is not None and "thread_id" in st.session_state
+    if has_thread and st.session_state.get("interrupted"):
+        st.info("Progress up to the failure was saved. Resume to continue without fetching everything again.")
+        st.button("Resume the interrupted plan", key="resume_plan", icon="⏯️")
+    elif (has_thread and st.session_state.get("has_plan")) or "itinerary" in st.session_state:
+        st.text_input("Want to change something? (e.g. swap day 1 and day 3, redo day 2, make it 4 days instead)",
+                      key="plan_change")
+        st.button("Update plan", key="update_plan", icon="✏️")
+        if not has_thread and st.session_state.get("update_plan") and change is None:
+            st.warning("Without checkpoints only day swaps, day rewrites, trip length, hotel and budget changes "
+                       "can be applied.")
+
+    if run is not None and config.trace_enabled:
+        tracer.write_histograms(config.trace_histogram_path)
+        with st.expander("Run timings"):
+            st.json(run.summary())
+            st.caption("Model tiers since startup")
+            st.json(tools_setup.router.tier_stats())
@@ -0,0 +1,99 @@
+import json
+import re
+from typing import List
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+class MessageCompactor:
+    """Keeps the prompt sent to the model bounded across agent iterations.
+
+    The graph state keeps every raw tool result; only the view passed to the
+    model is compacted:
+
+    1. Repeated tool results (same tool and content) are replaced with a
+       short reference to the first one.
+    2. Tool results from earlier rounds are cut down to a digest of their
+       leading sentences; the latest round is kept in full.
+    3. If the estimated prompt size is still above ``token_budget``, every
+       tool result is shrunk further until it fits.
+    """
+
+    CHARS_PER_TOKEN = 4
+    DIGEST_MARKER = re.compile(r" \[digest of (\d+) chars\]$")
+
+    def __init__(self, token_budget: int = 6000, digest_chars: int = 600, min_digest_chars: int = 160):
+        """
+        Args:
+            token_budget (int): Target upper bound for the estimated prompt tokens.
+            digest_chars (int): Characters kept from tool results of earlier rounds.
+            min_digest_chars (int): Floor when shrinking results to meet the budget.
+        """
+        self.token_budget = token_budget
+        self.digest_chars = digest_chars
+        self.min_digest_chars = min_digest_chars
+
+    @classmethod
+    def estimate_tokens(cls, messages: List[BaseMessage]) -> int:
+        total = 0
+        for m in messages:
+            total += len(str(m.content))
+            for call in getattr(m, "tool_calls", None) or []:
+                total += len(call["name"]) + len(json.dumps(call.get("args", {})))
+        return total // cls.CHARS_PER_TOKEN
+
+    @staticmethod
+    def digest(content: str, limit: int) -> str:
+        """Cut a tool result to about ``limit`` characters at a sentence boundary.
+
+        An existing digest is cut further under a single marker that keeps
+        the original length.
+        """
+        marker = MessageCompactor.DIGEST_MARKER.search(content)
+        body = content[:marker.start()] if marker else content
+        if len(body) <= limit:
+            return content
+        original = int(marker.group(1)) if marker else len(content)
+        cut = body[:limit]
+        boundary = max(cut.rfind(". "), cut.rfind("\n"))
+        if boundary > limit // 2:
+            cut = cut[:boundary + 1]
+        return f"{cut.rstrip()} [digest of {original} chars]"
+
+    def compact(self, messages: List[BaseMessage], fixed_tokens: int = 0) -> List[BaseMessage]:
+        """Return a compacted copy of the conversation.
+
+        Args:
+            messages (List[BaseMessage]): Conversation from the graph state.
+            fixed_tokens (int): Tokens of prompt parts that cannot shrink (system prompt).
+
+        Returns:
+            List[BaseMessage]: Messages with tool results deduplicated and digested.
+        """
+        last_round = max((i for i, m in enumerate(messages) if isinstance(m, AIMessage) and m.tool_calls), default=-1)
+        seen = {}
+        contents = []
+        for i, m in enumerate(messages):
+            if not isinstance(m, ToolMessage):
+                contents.append(None)
+                continue
+            content = str(m.content)
+            key = (m.name, content)
+            if key in seen and len(content) > 80:
+                contents.append(f"[Same result as the earlier {m.name} call {seen[key]}]")
+                continue
+            seen.setdefault(key, m.tool_call_id)
+            contents.append(content if i > last_round else self.digest(content, self.digest_chars))
+
+        compacted = self._apply(messages, contents)
+        limit = self.digest_chars
+        while self.estimate_tokens(compacted) + fixed_tokens > self.token_budget and limit > self.min_digest_chars:
+            limit = max(self.min_digest_chars, limit // 2)
+            contents = [self.digest(c, limit) if c is not None else None for c in contents]
+            compacted = self._apply(messages, contents)
+        return compacted
+
+    @staticmethod
+    def _apply(messages: List[BaseMessage], contents: List) -> List[BaseMessage]:
+        return [
+            m if content is None or content == m.content else m.model_copy(update={"content": content})
+            for m, content in zip(messages, contents)
+        ]
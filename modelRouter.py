@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, List
+from langchain_core.messages import AIMessage
+from instrumentation import tracer
+
+try:
+    from langgraph.constants import TAG_NOSTREAM
+except ImportError:
+    TAG_NOSTREAM = "nostream"
+
+class TierStats:
+    """Call, latency and token totals for one model tier."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fallbacks = 0
+        self.latency = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, latency: float, usage: dict) -> None:
+        self.calls += 1
+        self.latency += latency
+        self.input_tokens += usage.get("input_tokens") or 0
+        self.output_tokens += usage.get("output_tokens") or 0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "mean_latency_ms": round(self.latency / self.calls * 1000, 1) if self.calls else None,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+class ModelRouter:
+    """Routes model calls between a small and a large chat model.
+
+    Tool-selection iterations go to the small model first. Its answer is
+    kept only if it requests tools and every call names a known tool with
+    arguments that match the tool's schema. Otherwise, when it returns
+    invalid tool calls, fails with an API error or decides it is ready to
+    write the plan, the same messages are sent to the large model, which
+    writes the final Markdown (or picks tools itself). Small-model output is never streamed, so only
+    the large model's plan reaches the page.
+
+    Without a small model every call goes straight to the large one.
+    """
+
+    def __init__(self, large, tools: List, small=None):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.large = large
+        self.large_with_tools = large.bind_tools(tools)
+        self.small_with_tools = None
+        if small is not None:
+            self.small_with_tools = small.bind_tools(tools).with_config(tags=[TAG_NOSTREAM])
+        self.stats: Dict[str, TierStats] = {"small": TierStats(), "large": TierStats()}
+        self._lock = threading.Lock()
+
+    def invoke(self, messages: List) -> AIMessage:
+        """Answer one decision step, falling back to the large model when needed."""
+        if self.small_with_tools is not None:
+            try:
+                response = self._call("small", self.small_with_tools, messages)
+            except Exception as e:
+                # Malformed tool calls often come back as an API error (e.g. tool_use_failed)
+                print(f"Small model failed, using the large model: {e}")
+                response = None
+            if response is not None and response.tool_calls and self.valid_tool_calls(response):
+                return response
+            with self._lock:
+                self.stats["small"].fallbacks += 1
+            tracer.count("router_fallbacks")
+        return self._call("large", self.large_with_tools, messages)
+
+    def compose(self, messages: List) -> AIMessage:
+        """Write the final plan with the large model and no tools bound."""
+        return self._call("large", self.large, messages)
+
+    def valid_tool_calls(self, response: AIMessage) -> bool:
+        """True if every tool call names a known tool with schema-valid arguments."""
+        if getattr(response, "invalid_tool_calls", None):
+            return False
+        for call in response.tool_calls:
+            tool = self.tools_by_name.get(call["name"])
+            if tool is None:
+                return False
+            try:
+                if tool.args_schema is not None:
+                    tool.args_schema.model_validate(call["args"])
+            except Exception:
+                return False
+        return True
+
+    def _call(self, tier: str, model, messages: List) -> AIMessage:
+        with tracer.span("llm", tier, input_messages=len(messages)) as span:
+            start = time.perf_counter()
+            response = model.invoke(messages)
+            latency = time.perf_counter() - start
+            usage = getattr(response, "usage_metadata", None) or {}
+            span.set(
+                input_tokens=usage.get("input_tokens"),
+                output_tokens=usage.get("output_tokens"),
+                tool_calls=len(getattr(response, "tool_calls", []) or [])
+            )
+        with self._lock:
+            self.stats[tier].record(latency, usage)
+        tracer.count("llm_calls")
+        tracer.count(f"llm_calls:{tier}")
+        tracer.count("llm_input_tokens", usage.get("input_tokens") or 0)
+        tracer.count("llm_output_tokens", usage.get("output_tokens") or 0)
+        tracer.count(f"llm_input_tokens:{tier}", usage.get("input_tokens") or 0)
+        return response
+
+    def tier_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {tier: stats.as_dict() for tier, stats in self.stats.items()}
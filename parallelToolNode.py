@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import MessagesState
+from instrumentation import describe_error, tracer
+
+class ParallelToolNode:
+    """Tools stage that runs all tool calls of one AI message concurrently.
+
+    Drop-in replacement for ``ToolNode``: tool results are returned as
+    ``ToolMessage`` objects in the same order as the tool calls, so the
+    conversation stays valid for the next model call.
+    """
+
+    def __init__(self, tools: List, max_concurrency: int = 5, timeout: float = 30.0,
+                 timeouts: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            tools (List): Tools the model is allowed to call.
+            max_concurrency (int): Maximum number of tools running at the same time.
+            timeout (float): Default timeout in seconds for a single tool call.
+            timeouts (dict): Per-tool timeout overrides keyed by tool name.
+        """
+        self.tools_by_name = {t.name: t for t in tools}
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        # Long-lived pool: a timed-out tool keeps its thread until it returns, and
+        # asyncio.run() must not wait for it when the sync path shuts its loop down.
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2, thread_name_prefix="tool")
+
+    def as_runnable(self) -> RunnableLambda:
+        """Return a runnable usable with both ``graph.invoke`` and ``graph.ainvoke``."""
+        return RunnableLambda(self.invoke, afunc=self.ainvoke, name="tools")
+
+    def invoke(self, state: MessagesState) -> dict:
+        return asyncio.run(self.ainvoke(state))
+
+    async def ainvoke(self, state: MessagesState) -> dict:
+        message = state["messages"][-1]
+        tool_calls = message.tool_calls if isinstance(message, AIMessage) else []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        writer = self._stream_writer()
+        finished = 0
+
+        async def run(tool_call: dict) -> ToolMessage:
+            nonlocal finished
+            async with semaphore:
+                result = await self._run_tool(tool_call)
+            finished += 1
+            # Report progress to graph.stream(stream_mode="custom") as each tool finishes
+            writer({"event": "tool_end", "name": result.name, "status": result.status,
+                    "finished": finished, "total": len(tool_calls)})
+            return result
+
+        with tracer.span("node", "tools", tool_calls=len(tool_calls)):
+            # gather() keeps results in the order of the tool calls
+            results = await asyncio.gather(*(run(tc) for tc in tool_calls))
+        return {"messages": list(results)}
+
+    @staticmethod
+    def _stream_writer():
+        """Return the graph's custom stream writer, or a no-op outside a streamed run."""
+        try:
+            from langgraph.config import get_stream_writer
+            return get_stream_writer()
+        except Exception:
+            return lambda chunk: None
+
+    async def _run_tool(self, tool_call: dict) -> ToolMessage:
+        name = tool_call["name"]
+        tool = self.tools_by_name.get(name)
+        if tool is None:
+            content = f"Error: {name} is not a valid tool, try one of [{', '.join(self.tools_by_name)}]."
+            return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"], status="error")
+
+        timeout = self.timeouts.get(name, self.timeout)
+        with tracer.span("tool", name) as span:
+            try:
+                loop = asyncio.get_running_loop()
+                context = contextvars.copy_context()
+                future = loop.run_in_executor(self._executor, context.run, tool.invoke, tool_call["args"])
+                result = await asyncio.wait_for(future, timeout)
+                content = str(result)
+                span.set(status="success", result_bytes=len(content))
+                return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"])
+            except asyncio.TimeoutError:
+                content = f"Error: {name} timed out after {timeout:g} seconds. Real-time data is not available for this call."
+                span.set(status="timeout")
+            except Exception as e:
+                content = f"Error: {describe_error(e)}\n Please fix your mistakes."
+                span.set(status="error")
+        return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"], status="error")
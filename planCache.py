@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+from tripIntent import TripIntent
+
+HEADING = re.compile(r"^(#{1,6}\s+.+|\*\*[^*]+\*\*:?\s*)$")
+FX_START = "<!-- fx-rates -->"
+FX_END = "<!-- /fx-rates -->"
+
+class CachedPlan:
+    """A stored plan plus the time its volatile sections were last refreshed."""
+
+    def __init__(self, key: str, intent: dict, plan: str, created_at: float, refreshed_at: float):
+        self.key = key
+        self.intent = intent
+        self.plan = plan
+        self.created_at = created_at
+        self.refreshed_at = refreshed_at
+
+
+class PlanCache:
+    """Size-bounded on-disk cache of complete travel plans keyed by trip intent.
+
+    Plans older than ``max_age`` are regenerated. Within that window the
+    weather and currency sections go stale after ``volatile_max_age`` and are
+    re-rendered from live data instead of rerunning the whole agent loop.
+    """
+
+    MIN_PLAN_LENGTH = 700
+
+    def __init__(self, path: str, max_entries: int = 500, max_age: float = 7 * 24 * 60 * 60,
+                 volatile_max_age: float = 3 * 60 * 60):
+        """
+        Args:
+            path (str): SQLite file backing the cache.
+            max_entries (int): Maximum number of plans kept; least recently used are evicted.
+            max_age (float): Seconds a plan can be served before it is regenerated.
+            volatile_max_age (float): Seconds before weather/FX sections are refreshed.
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.volatile_max_age = volatile_max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "key TEXT PRIMARY KEY, intent TEXT, plan TEXT, "
+            "created_at REAL, refreshed_at REAL, accessed REAL)"
+        )
+        self._db.commit()
+
+    def lookup(self, intent: TripIntent) -> Optional[CachedPlan]:
+        """Return the stored plan for an intent, or None on a miss or expiry."""
+        key = intent.key()
+        if key is None:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT intent, plan, created_at, refreshed_at FROM plans WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.max_age:
+                if row is not None:
+                    self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE plans SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return CachedPlan(key, json.loads(row[0]), row[1], row[2], row[3])
+
+    def store(self, intent: TripIntent, plan: str) -> bool:
+        """Store a complete plan; short or unkeyable plans are ignored.
+
+        Returns:
+            bool: True if the plan was stored.
+        """
+        key = intent.key()
+        if key is None or not plan or len(plan) < self.MIN_PLAN_LENGTH:
+            return False
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans (key, intent, plan, created_at, refreshed_at, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(intent.to_dict()), plan, now, now, now)
+            )
+            self._db.execute(
+                "DELETE FROM plans WHERE key IN ("
+                "SELECT key FROM plans ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+        return True
+
+    def needs_refresh(self, cached: CachedPlan) -> bool:
+        return time.time() - cached.refreshed_at > self.volatile_max_age
+
+    def refresh(self, cached: CachedPlan, tools_setup) -> str:
+        """Re-render the weather and currency sections of a stored plan from live data.
+
+        Args:
+            cached (CachedPlan): Plan returned by :meth:`lookup`.
+            tools_setup (ToolsSetup): Source of the weather and currency services.
+
+        Returns:
+            str: The refreshed plan (also written back to the cache).
+        """
+        intent = cached.intent
+        city = intent.get("destination")
+        days = intent.get("days") or 5
+        plan = cached.plan
+
+        forecast = tools_setup.forecast_summary(city, min(days, 5)) if city else None
+        if forecast:
+            plan = replace_section(plan, "weather", forecast)
+
+        rates = []
+        currencies = intent.get("currencies") or []
+        base = intent.get("budget_currency") or (currencies[0] if currencies else None)
+        for currency in currencies:
+            if base and currency != base:
+                rate = tools_setup.currency_service.get_exchange_rate(base, currency)
+                if rate is not None:
+                    rates.append(f"- 1 {base} = {rate:,.4f} {currency}")
+        if rates:
+            plan = replace_fx_block(plan, "**Latest exchange rates:**\n" + "\n".join(rates))
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE plans SET plan = ?, refreshed_at = ? WHERE key = ?", (plan, now, cached.key)
+            )
+            self._db.commit()
+        cached.plan = plan
+        cached.refreshed_at = now
+        return plan
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+def replace_section(plan: str, keyword: str, body: str) -> str:
+    """Replace the body of the first Markdown section whose heading mentions ``keyword``."""
+    lines = plan.splitlines()
+    start = None
+    for i, line in enumerate(lines):
+        if HEADING.match(line.strip()):
+            if start is not None:
+                return "\n".join(lines[:start + 1] + ["", body, ""] + lines[i:])
+            if keyword in line.lower():
+                start = i
+    if start is not None:
+        return "\n".join(lines[:start + 1] + ["", body])
+    return plan
+
+def replace_fx_block(plan: str, block: str) -> str:
+    """Insert or update the marked exchange-rate block in the cost section."""
+    marked = f"{FX_START}\n{block}\n{FX_END}"
+    if FX_START in plan and FX_END in plan:
+        before, rest = plan.split(FX_START, 1)
+        return before + marked + rest.split(FX_END, 1)[1]
+    lines = plan.splitlines()
+    in_section = False
+    for i, line in enumerate(lines):
+        if HEADING.match(line.strip()):
+            if in_section:
+                return "\n".join(lines[:i] + [marked, ""] + lines[i:])
+            in_section = any(word in line.lower() for word in ("currency", "expense", "cost"))
+    return plan.rstrip() + "\n\n" + marked
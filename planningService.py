@@ -0,0 +1,315 @@
+"""Asynchronous multi-user planning service around TravelPlanner.
+
+Runs the compiled graph on a bounded pool of asyncio workers, shared by all
+users, and exposes a small JSON-over-HTTP API the Streamlit page can submit
+to and poll:
+
+    POST /jobs                      {"user_id": ..., "prompt": ...} -> {"job_id": ...}
+    GET  /jobs/<id>                 job status and final plan
+    GET  /jobs/<id>/events?after=N  long-poll for progress events after index N
+
+Run locally (``--stub-llm`` needs no API keys):
+    python planningService.py --stub-llm
+"""
+import argparse
+import asyncio
+import copy
+import json
+import time
+import uuid
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from config import Config
+from instrumentation import tracer
+
+class QueueFullError(Exception):
+    """Raised when the job queue is full (backpressure)."""
+
+
+class RateLimitedError(Exception):
+    """Raised when a user submits jobs faster than their rate limit."""
+
+
+class TokenBucket:
+    """Per-user rate limit: ``rate`` jobs per minute with bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def idle(self) -> bool:
+        """True once the bucket has refilled, i.e. it is no different from a new one."""
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.burst
+
+
+class Job:
+    """A submitted planning request and the progress events it produced."""
+
+    def __init__(self, user_id: str, prompt: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.prompt = prompt
+        self.status = "queued"
+        self.events = []
+        self.plan = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.changed = asyncio.Condition()
+
+    async def emit(self, event: dict) -> None:
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "user_id": self.user_id,
+            "status": self.status,
+            "plan": self.plan,
+            "error": self.error,
+            "events": len(self.events),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class PlanningService:
+    """Bounded asyncio job queue running plans on one shared graph.
+
+    The graph, chat model, HTTP client and caches are built once and shared
+    by every job; only the conversation state is per job.
+    """
+
+    def __init__(self, graph, workers: int = 4, queue_size: int = 32, rate_per_minute: float = 6,
+                 burst: int = 3, job_ttl: float = 60 * 60, recursion_limit: int = 12):
+        self.graph = graph
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.job_ttl = job_ttl
+        self.run_config = {"recursion_limit": recursion_limit}
+        self.jobs: Dict[str, Job] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._tasks = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, user_id: str, prompt: str) -> Job:
+        """Queue a planning request.
+
+        Raises:
+            RateLimitedError: If the user exceeded their rate limit.
+            QueueFullError: If the service is saturated.
+        """
+        # Checked first so a rejected request does not use up the user's rate limit
+        if self.queue.full():
+            raise QueueFullError("The planner is busy, please try again shortly.")
+        bucket = self.buckets.setdefault(user_id, TokenBucket(self.rate_per_minute, self.burst))
+        if not bucket.take():
+            raise RateLimitedError(f"Too many requests for user {user_id}, please wait a moment.")
+        job = Job(user_id, prompt)
+        self.queue.put_nowait(job)
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def events(self, job_id: str, after: int = 0, timeout: float = 25.0) -> list:
+        """Return events after index ``after``, waiting up to ``timeout`` for new ones."""
+        job = self.jobs[job_id]
+        async with job.changed:
+            if len(job.events) <= after and job.status in ("queued", "running"):
+                try:
+                    await asyncio.wait_for(job.changed.wait_for(lambda: len(job.events) > after), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return job.events[after:]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = "running"
+        await job.emit({"type": "status", "status": "running"})
+        final_state = None
+        try:
+            with tracer.run("service", job_id=job.id, user_id=job.user_id):
+                async for mode, chunk in self.graph.astream(
+                    {"messages": [job.prompt]},
+                    config=self.run_config,
+                    stream_mode=["messages", "custom", "values"]
+                ):
+                    if mode == "messages":
+                        token, metadata = chunk
+                        if metadata.get("langgraph_node") != "llm_decision_step":
+                            continue
+                        if getattr(token, "tool_call_chunks", None):
+                            await job.emit({"type": "reset"})
+                        elif isinstance(token.content, str) and token.content:
+                            await job.emit({"type": "token", "text": token.content})
+                    elif mode == "custom" and chunk.get("event") == "tool_end":
+                        await job.emit({"type": "tool", **{k: v for k, v in chunk.items() if k != "event"}})
+                    elif mode == "values":
+                        final_state = chunk
+            job.plan = final_state["messages"][-1].content if final_state else ""
+            job.status = "done"
+            await job.emit({"type": "done", "plan": job.plan})
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+            await job.emit({"type": "error", "error": job.error})
+        finally:
+            job.finished_at = time.time()
+
+    async def _cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(60)
+            cutoff = time.time() - self.job_ttl
+            for job_id in [j.id for j in self.jobs.values() if j.finished_at and j.finished_at < cutoff]:
+                del self.jobs[job_id]
+            for user_id in [u for u, bucket in self.buckets.items() if bucket.idle()]:
+                del self.buckets[user_id]
+
+    async def handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one keep-alive HTTP/1.1 connection of the JSON API."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                status, payload = await self._route(method, target, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes):
+        parsed = urlparse(target)
+        parts = [p for p in parsed.path.split("/") if p]
+        if method == "POST" and parts == ["jobs"]:
+            try:
+                request = json.loads(body or b"{}")
+                job = self.submit(str(request.get("user_id", "anonymous")), str(request["prompt"]))
+            except (KeyError, ValueError):
+                return 400, {"error": "Expected JSON with a prompt."}
+            except RateLimitedError as e:
+                return 429, {"error": str(e)}
+            except QueueFullError as e:
+                return 503, {"error": str(e)}
+            return 202, job.to_dict()
+        if method == "GET" and len(parts) >= 2 and parts[0] == "jobs":
+            job = self.get(parts[1])
+            if job is None:
+                return 404, {"error": "Unknown job."}
+            if parts[2:] == ["events"]:
+                query = parse_qs(parsed.query)
+                after = int(query.get("after", ["0"])[0])
+                timeout = min(float(query.get("timeout", ["25"])[0]), 60.0)
+                return 200, {"job": job.to_dict(), "events": await self.events(job.id, after, timeout)}
+            return 200, job.to_dict()
+        return 404, {"error": "Not found."}
+
+
+def stub_config(config: Config) -> Config:
+    """Copy of ``config`` for stub runs: nothing is persisted where the real app would read it."""
+    config = copy.copy(config)
+    config.cache_disk_path = None
+    config.plan_cache_enabled = False
+    config.checkpoint_enabled = False
+    config.trace_path = None
+    # Stay offline: no embedding model download for the search index
+    config.search_index_enabled = False
+    return config
+
+def build_graph(config: Config, stub_llm: bool = False):
+    """Build the shared graph; ``stub_llm`` replays fixtures against local stub backends."""
+    from main import TravelPlanner
+    if stub_llm:
+        import os
+        from benchmarks.fakeChatModel import FakeChatModel
+        from benchmarks.runPipeline import FIXTURES, build_planner
+        from benchmarks.stubServer import StubServer, latency_distribution
+        config = stub_config(config)
+        server = StubServer(latency=latency_distribution("lognormal", 0.05)).start()
+        llm = FakeChatModel.from_file(os.path.join(FIXTURES, "recording.json"), latency=0.3)
+        tools_setup = build_planner(config, server, llm)
+    else:
+        from toolsSetUp import ToolsSetup
+        tools_setup = ToolsSetup(config)
+    return TravelPlanner(tools_setup).createWorkflow()
+
+async def serve(config: Config, stub_llm: bool = False) -> None:
+    if stub_llm:
+        config = stub_config(config)
+    tracer.configure(config.trace_path, config.trace_enabled)
+    service = PlanningService(
+        build_graph(config, stub_llm),
+        workers=config.service_workers,
+        queue_size=config.service_queue_size,
+        rate_per_minute=config.service_rate_per_minute,
+        burst=config.service_burst
+    )
+    await service.start()
+    server = await asyncio.start_server(service.handle_http, config.service_host, config.service_port)
+    print(f"Planning service listening on http://{config.service_host}:{config.service_port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the asynchronous travel planning service.")
+    parser.add_argument("--stub-llm", action="store_true", help="Use the replaying fake model and stub backends")
+    parser.add_argument("--port", type=int, help="Override SERVICE_PORT")
+    args = parser.parse_args()
+    config = Config()
+    if args.port:
+        config.service_port = args.port
+    asyncio.run(serve(config, args.stub_llm))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import uuid
+from typing import List
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import MessagesState
+from instrumentation import tracer
+from parallelToolNode import ParallelToolNode
+from tripIntent import TripIntent
+
+class PrefetchStage:
+    """Graph entry stage that gathers the standard trip data up front.
+
+    Parses the destination, dates and currencies from the request and runs the
+    weather, search and FX tools in parallel before the first model call. The
+    results are added to the conversation as regular tool calls and results,
+    so the model can usually write the plan in one or two calls instead of
+    discovering each tool it needs one round-trip at a time.
+    """
+
+    def __init__(self, tool_node: ParallelToolNode, max_forecast_days: int = 5):
+        self.tool_node = tool_node
+        self.max_forecast_days = max_forecast_days
+
+    def plan_tool_calls(self, intent: TripIntent) -> List[dict]:
+        """Return the tool calls to prefetch for an intent (empty without a destination)."""
+        city = intent.destination
+        if not city:
+            return []
+        days = min(intent.days or self.max_forecast_days, self.max_forecast_days)
+        calls = [
+            ("get_weather_forecast", {"city": city, "days": days}),
+            ("search_attractions", {"city": city}),
+            ("search_restaurants", {"city": city}),
+            ("search_hotels", {"city": city, "budget_range": intent.budget_band or "mid-range"}),
+            ("search_transportation", {"city": city}),
+        ]
+        base = intent.budget_currency or (intent.currencies[0] if intent.currencies else None)
+        for currency in intent.currencies:
+            if base and currency != base:
+                calls.append(("get_exchange_rate", {"from_currency": base, "to_currency": currency}))
+        return [
+            {"name": name, "args": args, "id": f"prefetch_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+            for name, args in calls if name in self.tool_node.tools_by_name
+        ]
+
+    def as_runnable(self) -> RunnableLambda:
+        """Return a runnable usable with both ``graph.invoke`` and ``graph.ainvoke``."""
+        return RunnableLambda(self.invoke, afunc=self.ainvoke, name="prefetch")
+
+    def _call_message(self, state: MessagesState):
+        messages = state["messages"]
+        # Only the first turn is prefetched; later turns already have tool results
+        if any(isinstance(m, ToolMessage) for m in messages):
+            return None
+        request = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        if request is None or not isinstance(request.content, str):
+            return None
+        tool_calls = self.plan_tool_calls(TripIntent.from_text(request.content))
+        if not tool_calls:
+            return None
+        return AIMessage(content="Gathering the standard trip data before planning.", tool_calls=tool_calls)
+
+    def invoke(self, state: MessagesState) -> dict:
+        call_message = self._call_message(state)
+        if call_message is None:
+            return {"messages": []}
+        with tracer.span("node", "prefetch"):
+            results = self.tool_node.invoke({"messages": [call_message]})
+        return {"messages": [call_message] + results["messages"]}
+
+    async def ainvoke(self, state: MessagesState) -> dict:
+        call_message = self._call_message(state)
+        if call_message is None:
+            return {"messages": []}
+        with tracer.span("node", "prefetch"):
+            results = await self.tool_node.ainvoke({"messages": [call_message]})
+        return {"messages": [call_message] + results["messages"]}
@@ -0,0 +1,207 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from instrumentation import tracer
+from singleFlight import SingleFlight
+
+class ResponseCache:
+    """Bounded TTL + LRU cache for upstream API responses.
+
+    Entries live in an in-process LRU store and, when ``disk_path`` is set,
+    in a SQLite file as well so they survive Streamlit reruns and restarts.
+    Every entry belongs to a *kind* (e.g. ``"current_weather"``) that decides
+    its time-to-live. Concurrent misses for the same key share one load.
+    """
+
+    DEFAULT_TTLS = {
+        "current_weather": 10 * 60,
+        "weather_forecast": 3 * 60 * 60,
+        "exchange_rate": 6 * 60 * 60,
+        "search": 24 * 60 * 60,
+    }
+
+    def __init__(self, max_entries: int = 1024, ttls: Optional[Dict[str, float]] = None,
+                 disk_path: Optional[str] = None, max_disk_entries: int = 10000, coalesce: bool = True):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept in memory.
+            ttls (dict): Time-to-live in seconds per data kind.
+            disk_path (str): Optional SQLite file for the persistent store.
+            max_disk_entries (int): Maximum number of entries kept on disk.
+            coalesce (bool): Share one load between concurrent misses of a key.
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flight = SingleFlight(enabled=coalesce)
+        self._db = None
+        if disk_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+                self._db = sqlite3.connect(disk_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Disk cache disabled: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(kind: str, *parts) -> str:
+        """Build a normalized cache key from a data kind and request parameters."""
+        return kind + ":" + "|".join(str(p).strip().lower() for p in parts)
+
+    def get(self, kind: str, *parts) -> Any:
+        """Return a cached value or None if it is missing or expired."""
+        key = self.make_key(kind, *parts)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    tracer.count(f"cache_hit:{kind}")
+                    return value
+                del self._entries[key]
+
+            value, expires = self._disk_get(key, now)
+            if value is not None:
+                self.disk_hits += 1
+                tracer.count(f"cache_hit:{kind}")
+                # Keep the stored expiry; a fresh TTL would serve stale data for up to twice as long
+                self._store(key, value, expires)
+                return value
+
+            self.misses += 1
+            tracer.count(f"cache_miss:{kind}")
+            return None
+
+    def set(self, kind: str, value: Any, *parts) -> None:
+        """Store a value for the given kind and request parameters."""
+        if value is None:
+            return
+        key = self.make_key(kind, *parts)
+        expires = self._expires(kind, time.time())
+        with self._lock:
+            self._store(key, value, expires)
+            self._disk_set(key, value, expires)
+
+    def get_or_load(self, kind: str, loader: Callable[[], Any], *parts) -> Any:
+        """Return the cached value or call ``loader`` and cache its result.
+
+        Concurrent callers that miss on the same key wait for a single
+        ``loader`` call. Failed loads (``None``) are not cached so the next
+        call retries.
+        """
+        value = self.get(kind, *parts)
+        if value is not None:
+            return value
+        key = self.make_key(kind, *parts)
+        return self.flight.do(key, lambda: self._load(key, kind, loader, parts))
+
+    def _load(self, key: str, kind: str, loader: Callable[[], Any], parts: tuple) -> Any:
+        # A load for this key may have finished between our miss and taking the lead
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                return entry[0]
+        value = loader()
+        self.set(kind, value, *parts)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _expires(self, kind: str, now: float) -> float:
+        return now + self.ttls.get(kind, 60 * 60)
+
+    def _store(self, key: str, value: Any, expires: float) -> None:
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str, now: float):
+        """Return ``(value, expires)`` from disk, or ``(None, None)`` if missing or expired."""
+        if self._db is None:
+            return None, None
+        try:
+            row = self._db.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None, None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None, None
+            self._db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error reading disk cache: {e}")
+            return None, None
+
+    def _disk_set(self, key: str, value: Any, expires: float) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires, time.time())
+            )
+            # Evict the least recently used rows beyond the disk bound
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+            self._db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Error writing disk cache: {e}")
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_shared_cache(config) -> ResponseCache:
+    """Return the process-wide cache so every ToolsSetup and rerun shares it."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                max_entries=config.cache_max_entries,
+                ttls=config.cache_ttls,
+                disk_path=config.cache_disk_path,
+                coalesce=config.coalesce_requests
+            )
+        return _shared_cache
@@ -0,0 +1,211 @@
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+from instrumentation import tracer
+from singleFlight import SingleFlight
+
+class ProviderStats:
+    """Rolling latency and error statistics for one search provider.
+
+    Latency and error rate are exponentially weighted so a provider that
+    recovers is routed to again.
+    """
+
+    ERROR_PENALTY = 10.0
+    FAILING_ERROR_RATE = 0.5
+    # A failing provider is retried first again once it has not been called for this long
+    RETRY_AFTER = 300.0
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.calls = 0
+        self.errors = 0
+        self.latency = None
+        self.error_rate = 0.0
+        self.updated = None
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.calls += 1
+        self.updated = time.time()
+        if not ok:
+            self.errors += 1
+        if self.latency is None:
+            self.latency = latency
+            self.error_rate = 0.0 if ok else 1.0
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+            self.error_rate = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self.error_rate
+
+    def failing(self) -> bool:
+        """True if most recent calls failed and the provider has not rested since."""
+        return (self.error_rate > self.FAILING_ERROR_RATE and self.updated is not None
+                and time.time() - self.updated < self.RETRY_AFTER)
+
+    def score(self) -> float:
+        """Expected cost in seconds; lower is better, unknown providers score 0 so they get tried."""
+        if self.latency is None:
+            return 0.0
+        return self.latency + self.ERROR_PENALTY * self.error_rate
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+        }
+
+
+class SearchBroker:
+    """Routes web searches across the configured providers.
+
+    Modes:
+        race: fire the best ``race_width`` providers at once and take the
+            first acceptable result.
+        hedged: start the best provider and add the next one every
+            ``hedge_delay`` seconds until an acceptable result arrives.
+        sequential: try providers one after another (the original behavior).
+
+    Providers are ordered by their observed latency and error rate, so slow
+    or failing providers drop out of the first wave. Results are cached per
+    normalized query, and concurrent searches for the same query share one
+    provider round.
+    """
+
+    MIN_RESULT_LENGTH = 50
+
+    def __init__(self, mode: str = "race", race_width: int = 2, hedge_delay: float = 1.0,
+                 timeout: float = 20.0, cache=None, max_workers: int = 8, coalesce: bool = True):
+        self.mode = mode
+        self.race_width = max(1, race_width)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.cache = cache
+        self.providers: Dict[str, Callable[[str], str]] = {}
+        self.fallbacks: Dict[str, bool] = {}
+        self.stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+        self.flight = SingleFlight(enabled=coalesce)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+
+    def add_provider(self, name: str, run: Callable[[str], str], fallback: bool = False) -> None:
+        """Register a provider.
+
+        Args:
+            name (str): Provider name used for routing and stats.
+            run (Callable): Function taking a query and returning result text.
+            fallback (bool): Accept any non-empty result from this provider
+                (used for DuckDuckGo, which has no quota to protect).
+        """
+        self.providers[name] = run
+        self.fallbacks[name] = fallback
+        self.stats[name] = ProviderStats()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", query.lower())).strip()
+
+    def _acceptable(self, name: str, result: Optional[str]) -> bool:
+        if not result:
+            return False
+        return self.fallbacks[name] or len(result) > self.MIN_RESULT_LENGTH
+
+    def _ranked(self, names: Optional[List[str]]) -> List[str]:
+        candidates = [n for n in (names or self.providers) if n in self.providers]
+        with self._lock:
+            # Fallback providers go last unless the others are all failing
+            primaries = [n for n in candidates if not self.fallbacks[n]]
+            if primaries and all(self.stats[n].failing() for n in primaries):
+                return sorted(candidates, key=lambda n: self.stats[n].score())
+            return sorted(candidates, key=lambda n: (self.fallbacks[n], self.stats[n].score()))
+
+    def _call(self, name: str, query: str) -> Tuple[str, Optional[str]]:
+        start = time.perf_counter()
+        with tracer.span("search", name) as span:
+            try:
+                result = self.providers[name](query)
+            except Exception as e:
+                print(f"Search provider {name} failed: {e}")
+                result = None
+            ok = self._acceptable(name, result)
+            span.set(accepted=ok, response_bytes=len(result) if result else 0)
+        with self._lock:
+            self.stats[name].record(time.perf_counter() - start, ok)
+        return name, result if ok else None
+
+    def search(self, query: str, providers: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Run a search and return ``(provider_name, result)``.
+
+        Args:
+            query (str): Search query.
+            providers (List[str]): Restrict the search to these providers.
+
+        Returns:
+            Tuple: Winning provider and its result, or ``(None, None)``.
+        """
+        key = self.normalize_query(query)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        return self.flight.do(f"search:{key}", lambda: self._search(key, query, providers))
+
+    def _cached(self, key: str) -> Optional[Tuple[str, str]]:
+        if self.cache is not None:
+            cached = self.cache.get("search", key)
+            if cached is not None:
+                return cached["provider"], cached["result"]
+        return None
+
+    def _search(self, key: str, query: str, providers: Optional[List[str]]) -> Tuple[Optional[str], Optional[str]]:
+        ranked = self._ranked(providers)
+        if self.mode == "sequential":
+            winner = self._sequential(ranked, query)
+        else:
+            winner = self._race(ranked, query)
+
+        if winner[1] is not None and self.cache is not None:
+            self.cache.set("search", {"provider": winner[0], "result": winner[1]}, key)
+        return winner
+
+    def _sequential(self, ranked: List[str], query: str) -> Tuple[Optional[str], Optional[str]]:
+        for name in ranked:
+            _, result = self._call(name, query)
+            if result is not None:
+                return name, result
+        return None, None
+
+    def _race(self, ranked: List[str], query: str) -> Tuple[Optional[str], Optional[str]]:
+        deadline = time.monotonic() + self.timeout
+        waiting = list(ranked)
+        pending = set()
+
+        def launch(count: int) -> None:
+            for _ in range(min(count, len(waiting))):
+                context = contextvars.copy_context()
+                pending.add(self._executor.submit(context.run, self._call, waiting.pop(0), query))
+
+        launch(self.race_width if self.mode == "race" else 1)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = min(remaining, self.hedge_delay) if self.mode == "hedged" and waiting else remaining
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, result = future.result()
+                if result is not None:
+                    return name, result
+            if done:
+                # Replace providers that failed with the next ranked ones
+                launch(len(done))
+            elif self.mode == "hedged":
+                # The current wave is slow, hedge with one more provider
+                launch(1)
+        return None, None
+
+    def provider_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self.stats.items()}
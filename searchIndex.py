@@ -0,0 +1,237 @@
+import hashlib
+import importlib.util
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from instrumentation import tracer
+
+class _CityIndex:
+    """Vectors and chunk metadata for one city."""
+
+    def __init__(self, faiss, dim: int):
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        self.chunks: Dict[int, dict] = {}
+        self.hashes: Dict[str, int] = {}
+
+
+class SearchIndex:
+    """Local semantic index over web search results, keyed by city.
+
+    Search results are split into short chunks, embedded in batches with a
+    sentence-transformers model and added to a per-city FAISS inner-product
+    index (embeddings are normalized, so scores are cosine similarities).
+    Once a city has fresh chunks of a kind (attractions, restaurants, ...),
+    a query returns the top-k matching snippets instead of running a live
+    search. Chunks older than ``max_age`` seconds are evicted.
+
+    Building the index does not load the embedding model; call
+    :meth:`warm_up` to load it on a background thread. Until it is
+    :attr:`ready`, callers should search live instead of waiting on it.
+
+    Raises:
+        ImportError: If faiss or sentence-transformers is not installed.
+    """
+
+    SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+|\s*\.\.\.\s*|\n+")
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", top_k: int = 5,
+                 max_age: float = 86400, chunk_chars: int = 400, batch_size: int = 32,
+                 min_score: float = 0.2, encoder=None):
+        import faiss
+        if encoder is None and importlib.util.find_spec("sentence_transformers") is None:
+            raise ImportError("sentence-transformers is required for the search index")
+        self._faiss = faiss
+        self.model_name = model_name
+        self.top_k = top_k
+        self.max_age = max_age
+        self.chunk_chars = chunk_chars
+        self.batch_size = batch_size
+        self.min_score = min_score
+        self._encoder = encoder
+        self._load_error = None
+        self._cities: Dict[str, _CityIndex] = {}
+        self._next_id = 0
+        self._last_eviction = time.time()
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_city(city: str) -> str:
+        return " ".join(city.lower().split())
+
+    @property
+    def ready(self) -> bool:
+        """True once the embedding model is loaded."""
+        return self._encoder is not None
+
+    @property
+    def failed(self) -> bool:
+        """True if loading the embedding model failed."""
+        return self._load_error is not None
+
+    def warm_up(self) -> threading.Thread:
+        """Load the embedding model on a daemon thread and return the thread."""
+        thread = threading.Thread(target=self._warm_up, name="search-index-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self) -> None:
+        try:
+            self.encoder
+        except Exception as e:
+            print(f"Search index disabled: {e}")
+
+    @property
+    def encoder(self):
+        with self._load_lock:
+            if self._encoder is None:
+                if self._load_error is not None:
+                    raise self._load_error
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._encoder = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    # Don't retry a failed download on every search
+                    self._load_error = e
+                    raise
+            return self._encoder
+
+    def chunk(self, text: str) -> List[str]:
+        """Split a search result into sentence-aligned chunks of at most ``chunk_chars``."""
+        chunks, current = [], ""
+        for sentence in self.SPLIT_PATTERN.split(text):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if current and len(current) + len(sentence) + 1 > self.chunk_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+            while len(current) > self.chunk_chars:
+                chunks.append(current[:self.chunk_chars])
+                current = current[self.chunk_chars:]
+        if current:
+            chunks.append(current)
+        return [c for c in chunks if len(c) >= 30]
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.encoder.encode(texts, batch_size=self.batch_size, normalize_embeddings=True,
+                                      show_progress_bar=False)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def add(self, city: str, kind: str, texts: List[str]) -> int:
+        """Chunk, embed and add search results for a city.
+
+        Chunks already in the city's index are refreshed instead of added
+        twice. All new chunks are embedded in one batched call.
+
+        Returns:
+            int: Number of chunks added or refreshed.
+        """
+        key = self.normalize_city(city)
+        chunks = list(dict.fromkeys(c for text in texts if text for c in self.chunk(text)))
+        if not chunks:
+            return 0
+        now = time.time()
+        with tracer.span("index", "add", city=key, result_kind=kind, chunks=len(chunks)):
+            with self._lock:
+                entry = self._cities.get(key)
+                new_chunks = []
+                for text in chunks:
+                    digest = hashlib.sha1(f"{kind}|{text}".encode("utf-8")).hexdigest()
+                    chunk_id = entry.hashes.get(digest) if entry else None
+                    if chunk_id is not None:
+                        entry.chunks[chunk_id]["added_at"] = now
+                    else:
+                        new_chunks.append((digest, text))
+            if new_chunks:
+                vectors = self._embed([text for _, text in new_chunks])
+                with self._lock:
+                    entry = self._cities.get(key)
+                    if entry is None:
+                        entry = self._cities[key] = _CityIndex(self._faiss, vectors.shape[1])
+                    ids = np.arange(self._next_id, self._next_id + len(new_chunks), dtype=np.int64)
+                    self._next_id += len(new_chunks)
+                    entry.index.add_with_ids(vectors, ids)
+                    for chunk_id, (digest, text) in zip(ids.tolist(), new_chunks):
+                        entry.chunks[chunk_id] = {"kind": kind, "text": text, "digest": digest, "added_at": now}
+                        entry.hashes[digest] = chunk_id
+        self._maybe_evict()
+        return len(chunks)
+
+    def has(self, city: str, kind: Optional[str] = None) -> bool:
+        """True if the city has fresh chunks (of the given kind)."""
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            entry = self._cities.get(self.normalize_city(city))
+            if entry is None:
+                return False
+            return any(c["added_at"] >= cutoff and (kind is None or c["kind"] == kind)
+                       for c in entry.chunks.values())
+
+    def search(self, city: str, query: str, kind: Optional[str] = None, k: Optional[int] = None) -> List[str]:
+        """Return the top-k fresh snippets for a city, best match first.
+
+        An empty list means the city (or kind) is not indexed and the caller
+        should run a live search.
+        """
+        k = k or self.top_k
+        if not self.has(city, kind):
+            tracer.count(f"index_miss:{kind or 'any'}")
+            return []
+        key = self.normalize_city(city)
+        cutoff = time.time() - self.max_age
+        with tracer.span("index", "search", city=key, result_kind=kind):
+            vector = self._embed([query])
+            with self._lock:
+                entry = self._cities.get(key)
+                if entry is None:
+                    return []
+                # A city holds a few hundred chunks at most, so filtering by kind
+                # ranks all of them rather than risking fewer than k results
+                fetch = entry.index.ntotal if kind else min(entry.index.ntotal, k)
+                scores, ids = entry.index.search(vector, fetch)
+                snippets = []
+                for score, chunk_id in zip(scores[0].tolist(), ids[0].tolist()):
+                    chunk = entry.chunks.get(chunk_id)
+                    if chunk is None or chunk["added_at"] < cutoff or score < self.min_score:
+                        continue
+                    if kind is not None and chunk["kind"] != kind:
+                        continue
+                    snippets.append(chunk["text"])
+                    if len(snippets) == k:
+                        break
+        tracer.count(f"index_hit:{kind or 'any'}" if snippets else f"index_miss:{kind or 'any'}")
+        return snippets
+
+    def evict_stale(self) -> int:
+        """Remove chunks older than ``max_age``; returns the number removed."""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        with self._lock:
+            for key in list(self._cities):
+                entry = self._cities[key]
+                stale = [i for i, c in entry.chunks.items() if c["added_at"] < cutoff]
+                if stale:
+                    entry.index.remove_ids(np.array(stale, dtype=np.int64))
+                    for chunk_id in stale:
+                        entry.hashes.pop(entry.chunks.pop(chunk_id)["digest"], None)
+                    removed += len(stale)
+                if not entry.chunks:
+                    del self._cities[key]
+            self._last_eviction = time.time()
+        return removed
+
+    def _maybe_evict(self) -> None:
+        if time.time() - self._last_eviction > min(self.max_age, 600):
+            self.evict_stale()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cities": len(self._cities),
+                "chunks": sum(len(e.chunks) for e in self._cities.values()),
+                "model_loaded": self._encoder is not None,
+            }
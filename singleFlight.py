@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+from instrumentation import tracer
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one.
+
+    The first caller of a key runs the function; callers that arrive while
+    it is in flight wait for that call and share its result (or exception)
+    instead of sending a duplicate upstream request. Nothing is stored once
+    the call returns; caching is left to the caller. With ``enabled=False``
+    every caller runs its own call, which is useful for measuring the effect.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def _join(self, key: str):
+        """Return ``(future, leader)`` for a key, registering a new call if none is in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, fn: Callable[[], Any]) -> None:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    @staticmethod
+    def _kind(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` once for all threads asking for ``key`` at the same time."""
+        if not self.enabled:
+            return fn()
+        future, leader = self._join(key)
+        if leader:
+            self._finish(key, future, fn)
+        else:
+            tracer.count(f"coalesced:{self._kind(key)}")
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"leaders": self.leaders, "shared": self.shared, "in_flight": len(self._calls)}
@@ -1,24 +1,37 @@
 import os
-from typing import List
-from langchain.tools import tool
-import currencyService
-from langchain_groq import ChatGroq
+from typing import List, Optional
+from langchain_core.tools import tool
 from config import Config
 from currencyService import CurrencyService
 from weatherService import WeatherService
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_community.utilities import SerpAPIWrapper, GoogleSerperAPIWrapper
+from responseCache import get_shared_cache
+from httpClient import get_shared_http_client
+from searchBroker import SearchBroker
+from budgetEngine import BudgetEngine, CostItem
+from modelRouter import ModelRouter
+from searchIndex import SearchIndex
 
 class ToolsSetup:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, llm=None, small_llm=None):
         self.config = config
-        self.weather_service = WeatherService(config.openweather_api_key)
-        self.currency_service = CurrencyService(config.exchange_rate_api_key)
+        self.cache = get_shared_cache(config)
+        self.http_client = get_shared_http_client(config)
+        self.weather_service = WeatherService(config.openweather_api_key, cache=self.cache, http_client=self.http_client)
+        self.currency_service = CurrencyService(
+            config.exchange_rate_api_key,
+            cache=self.cache,
+            base_currency=config.fx_base_currency,
+            refresh_interval=config.fx_refresh_interval,
+            http_client=self.http_client
+        )
+        # Provider modules are imported only when they are used or their key is configured
+        from langchain_community.tools import DuckDuckGoSearchRun
         self.search_tool = DuckDuckGoSearchRun()
             
        # Initialize Google Serper for real-time search
         try:
             if config.serper_api_key:
+                from langchain_community.utilities import GoogleSerperAPIWrapper
                 self.serper_search = GoogleSerperAPIWrapper(serper_api_key=config.serper_api_key)
             else:
                 self.serper_search = None
@@ -28,17 +41,100 @@ class ToolsSetup:
         # Initialize SerpAPI for real-time Google search results
         try:
             if config.serpapi_key:
+                from langchain_community.utilities import SerpAPIWrapper
                 self.serp_search = SerpAPIWrapper(serpapi_api_key=config.serpapi_key)
             else:
                 self.serp_search = None
         except Exception:
             self.serp_search = None
         
-        # Initialize LLM
-        self.llm = ChatGroq(model="qwen/qwen3-32b")
+        self.budget_engine = BudgetEngine(self.currency_service)
+
+        # Route searches across the configured providers
+        self.search_broker = SearchBroker(
+            mode=config.search_mode,
+            race_width=config.search_race_width,
+            hedge_delay=config.search_hedge_delay,
+            timeout=config.search_timeout,
+            cache=self.cache,
+            coalesce=config.coalesce_requests
+        )
+        if self.serp_search:
+            self.search_broker.add_provider("serpapi", self.serp_search.run)
+        if self.serper_search:
+            self.search_broker.add_provider("serper", self.serper_search.run)
+        self.search_broker.add_provider("duckduckgo", self.search_tool.invoke, fallback=True)
+
+        # Serve repeat searches for a city from the local semantic index
+        self.search_index = None
+        if config.search_index_enabled:
+            try:
+                self.search_index = SearchIndex(
+                    model_name=config.search_index_model,
+                    top_k=config.search_index_top_k,
+                    max_age=config.search_index_max_age,
+                    chunk_chars=config.search_index_chunk_chars,
+                    batch_size=config.search_index_batch_size
+                )
+                self.search_index.warm_up()
+            except ImportError as e:
+                print(f"Search index disabled: {e}")
+
+        # Initialize LLMs (injected chat models are used by the offline benchmarks);
+        # the small tier picks tools, the large tier writes the plan
+        if llm is None:
+            from langchain_groq import ChatGroq
+            llm = ChatGroq(model=config.large_model)
+            if small_llm is None and config.small_model:
+                small_llm = ChatGroq(model=config.small_model, max_tokens=config.small_model_max_tokens)
+        self.llm = llm
+        self.small_llm = small_llm
 
         self.tools = self.build_tools()
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
+        self.router = ModelRouter(self.llm, self.tools, small=self.small_llm)
+        self.llm_with_tools = self.router.large_with_tools
+
+    def _search(self, query: str, providers: List[str], label: str,
+                city: Optional[str] = None, kind: Optional[str] = None) -> str:
+        """Search through the broker and label results from the API providers.
+
+        With a city and kind, a city already in the search index is answered
+        with its top matching snippets; live results are added to the index.
+        """
+        index = self.search_index if city and kind else None
+        if index is not None and not index.ready:
+            if index.failed:
+                self.search_index = None
+            # The embedding model is still loading (or failed to); search live without it
+            index = None
+        if index is not None:
+            try:
+                snippets = index.search(city, query, kind=kind)
+            except Exception as e:
+                # e.g. the embedding model cannot be loaded; stop using the index
+                print(f"Search index disabled: {e}")
+                self.search_index = index = None
+                snippets = []
+            if snippets:
+                return f"{label} (top matches for {city}):\n" + "\n".join(f"- {s}" for s in snippets)
+
+        provider, result = self.search_broker.search(query, providers)
+        if result is None:
+            return f"No search results available for: {query}"
+        if index is not None:
+            try:
+                index.add(city, kind, [result])
+            except Exception as e:
+                print(f"Search index disabled: {e}")
+                self.search_index = None
+        if provider == "duckduckgo":
+            return result
+        return f"{label}: {result}"
+
+    def forecast_summary(self, city: str, days: int = 5) -> str:
+        """Format the daily weather forecast for a city, or None if it is not available."""
+        forecast = self.weather_service.get_city_forecast(city, days)
+        return forecast.summary(days) if forecast else None
 
     def build_tools(self) -> List[tool]:
         """Build and return the list of tools."""
@@ -46,54 +142,22 @@ class ToolsSetup:
         def search_attractions(city: str) -> str:
             """Search for top attractions in a city using real-time data also try to fetch images"""
             query = f"top attractions activities things to do in {city}"
-            
-            if self.serp_search:
-                try:
-                    serp_result = self.serp_search.run(query)
-                    if serp_result and len(serp_result) > 50:
-                        return f"Latest search results: {serp_result}"
-                except Exception:
-                    pass
-            
-            if self.serper_search:
-                try:
-                    serper_result = self.serper_search.run(query)
-                    if serper_result and len(serp_result) > 50:
-                        return f"Current search data: {serper_result}"
-                except Exception:
-                    pass
-            
-            return self.search_tool.invoke(query)
+            return self._search(query, ["serpapi", "serper", "duckduckgo"], "Latest search results",
+                                city, "attractions")
         
         @tool
         def search_restaurants(city: str) -> str:
             """Search for restaurants in a city using real-time data also try to fetch images"""
             query = f"best restaurants food places to eat in {city}"
-            
-            if self.serp_search:
-                try:
-                    serp_result = self.serp_search.run(query)
-                    if serp_result and len(serp_result) > 50:
-                        return f"Latest restaurant results: {serp_result}"
-                except Exception:
-                    pass
-            
-            return self.search_tool.invoke(query)
+            return self._search(query, ["serpapi", "duckduckgo"], "Latest restaurant results",
+                                city, "restaurants")
         
         @tool
         def search_transportation(city: str) -> str:
             """Search for transportation options in a city using real-time data"""
             query = f"transportation options getting around {city} public transport taxi uber"
-            
-            if self.serper_search:
-                try:
-                    serper_result = self.serper_search.run(query)
-                    if serper_result and len(serper_result) > 50:
-                        return f"Latest transport data: {serper_result}"
-                except Exception:
-                    pass
-
-            return self.search_tool.invoke(query)
+            return self._search(query, ["serper", "duckduckgo"], "Latest transport data",
+                                city, "transportation")
         
         @tool
         def get_current_weather(city: str) -> str:
@@ -107,108 +171,51 @@ class ToolsSetup:
         
         @tool
         def get_weather_forecast(city: str, days: int = 5) -> str:
-            """Get weather forecast for a city"""
-            forecast_data = self.weather_service.get_weather_forecast(city, days)
-            if forecast_data and 'list' in forecast_data:
-                forecast_summary = []
-                for i in range(0, min(len(forecast_data['list']), days * 8), 8):
-                    item = forecast_data['list'][i]
-                    date = item['dt_txt'].split(' ')[0]
-                    temp = item['main']['temp']
-                    desc = item['weather'][0]['description']
-                    forecast_summary.append(f"{date}: {temp}°C, {desc}")
-                return f"Weather forecast for {city}:\n" + "\n".join(forecast_summary)
-            return f"Could not fetch forecast for {city}"
+            """Get daily weather forecast for a city with min/max temperature, rain chance, wind and advisories"""
+            return self.forecast_summary(city, days) or f"Could not fetch forecast for {city}"
+
+        @tool
+        def get_multi_city_forecast(cities: List[str], days: int = 5) -> str:
+            """Get daily weather forecasts (min/max temperature, rain chance, wind, advisories) for every city of a multi-city itinerary at once"""
+            forecasts = self.weather_service.get_city_forecasts(cities, days)
+            return "\n\n".join(
+                forecast.summary(days) if forecast else f"Could not fetch forecast for {city}"
+                for city, forecast in forecasts.items()
+            )
         
         @tool
         def search_hotels(city: str, budget_range: str = "mid-range") -> str:
             """Search for hotels in a city with budget range using real-time data also try to fetch images"""
             query = f"{budget_range} hotels accommodation {city} price per night booking availability"
-    
-            if self.serp_search:
-                try:
-                    serp_result = self.serp_search.run(query)
-                    if serp_result and len(serp_result) > 50:
-                        return f"Real-time hotel data: {serp_result}"
-                except Exception:
-                    pass
-            
-            if self.serper_search:
-                try:
-                    serper_result = self.serper_search.run(query)
-                    if serper_result and len(serp_result) > 50:
-                        return f"Latest hotel availability: {serper_result}"
-                except Exception:
-                    pass
-            
-            return self.search_tool.invoke(query)
+            return self._search(query, ["serpapi", "serper", "duckduckgo"], "Real-time hotel data",
+                                city, f"hotels:{budget_range}")
         
         @tool
-        def estimate_hotel_cost(price_per_night: float, total_days: int) -> float:
-            """Calculate total hotel cost"""
-            return multiply(price_per_night, total_days)
-        
-        @tool
-        def add(a: float, b: float) -> float:
-            """
-            Add two numbers.
-
-            Args:
-                a (float): First number.
-                b (float): Second number.
-
-            Returns:
-                float: The sum of a and b.
+        def calculate_trip_budget(items: List[CostItem], days: int, currency: str = "USD",
+                                  display_currencies: Optional[List[str]] = None) -> str:
             """
-            return round(a + b, 2)
+            Calculate the complete trip budget from an itemized cost sheet in one call.
 
-
-        @tool
-        def multiply(a: float, b: float) -> float:
-            """
-            Multiply two numbers.
+            Use this for all budget math (hotel cost, totals, daily budget, currency views)
+            instead of adding or multiplying numbers step by step.
 
             Args:
-                a (float): First number.
-                b (float): Second number.
-
-            Returns:
-                float: The product of a and b.
-            """
-            return round(a * b, 2)
-
-
-        @tool
-        def calculate_total_cost(hotel_cost: float, activity_cost: float, transport_cost: float) -> float:
-            """
-            Calculate the total cost of the trip.
-
-            Args:
-                hotel_cost (float): Total hotel cost.
-                activity_cost (float): Total activity/entertainment cost.
-                transport_cost (float): Total transportation cost.
-
-            Returns:
-                float: Combined total trip cost.
-            """
-            return round(hotel_cost + activity_cost + transport_cost, 2)
-
-
-        @tool
-        def calculate_daily_budget(total_cost: float, days: int) -> float:
-            """
-            Calculate daily budget based on total cost and number of days.
-
-            Args:
-                total_cost (float): Total expense for the trip.
+                items (List[CostItem]): Every cost of the trip. Use day for a cost on one day,
+                    daily=true for a cost repeated every day (e.g. hotel per night, meals),
+                    and neither for one-off trip costs (e.g. flights, passes).
                 days (int): Total number of travel days.
+                currency (str): Currency to compute the budget in.
+                display_currencies (List[str]): Other currencies to show the totals in.
 
             Returns:
-                float: Estimated daily budget.
+                str: Markdown table of costs by category and day, totals, per-day budget
+                and the totals in each display currency.
             """
-            if days <= 0:
-                raise ValueError("Days must be greater than zero.")
-            return round(total_cost / days, 2)
+            try:
+                result = self.budget_engine.calculate(items, days, currency, display_currencies)
+            except ValueError as e:
+                return f"Could not calculate the budget: {e}"
+            return self.budget_engine.to_markdown(result)
         
         @tool
         def get_exchange_rate(from_currency: str, to_currency: str) -> float:
@@ -219,7 +226,7 @@ class ToolsSetup:
             Returns:
                 float: The exchange rate from from_currency to to_currency.
             """
-            return currencyService.CurrencyService.get_exchange_rate(from_currency, to_currency)
+            return self.currency_service.get_exchange_rate(from_currency, to_currency)
         
         @tool
         def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
@@ -230,7 +237,26 @@ class ToolsSetup:
                 to_currency (str): The currency to convert to.
                 Returns:
                 float: The converted amount in to_currency."""
-            return currencyService.CurrencyService.convert_currency(amount, from_currency, to_currency)
+            return self.currency_service.convert_currency(amount, from_currency, to_currency)
+
+        @tool
+        def convert_amounts(amounts: List[float], from_currency: str, to_currencies: List[str]) -> str:
+            """Convert a list of amounts (e.g. a whole cost breakdown) into one or more currencies at once.
+            Args:
+                amounts (List[float]): The amounts to convert.
+                from_currency (str): The currency of the amounts.
+                to_currencies (List[str]): The currencies to convert into, e.g. ["JPY", "USD"].
+            Returns:
+                str: One line per target currency with the converted amounts and their total."""
+            lines = []
+            for to_currency in to_currencies:
+                converted = self.currency_service.convert_many(amounts, from_currency, to_currency)
+                if converted is None:
+                    lines.append(f"{to_currency}: conversion not available")
+                    continue
+                values = ", ".join(f"{value:,.2f}" for value in converted)
+                lines.append(f"{to_currency}: {values} (total {sum(converted):,.2f})")
+            return "\n".join(lines)
         
         @tool
         def create_daily_plan(city: str, day_number: int, attractions: str, weather: str) -> str:
@@ -268,9 +294,8 @@ class ToolsSetup:
         
         return [
             search_attractions, search_restaurants, search_transportation,
-            get_current_weather, get_weather_forecast, search_hotels,
-            estimate_hotel_cost,add, multiply, calculate_total_cost,
-            calculate_daily_budget, get_exchange_rate, convert_currency,
+            get_current_weather, get_weather_forecast, get_multi_city_forecast, search_hotels,
+            calculate_trip_budget, get_exchange_rate, convert_currency, convert_amounts,
             create_daily_plan, complete_travel_plan
         ]
         
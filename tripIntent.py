@@ -0,0 +1,257 @@
+import hashlib
+import json
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+MONTHS = ("january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december")
+
+CURRENCY_NAMES = {
+    "yen": "JPY", "dollar": "USD", "euro": "EUR", "pound": "GBP", "sterling": "GBP",
+    "rupee": "INR", "yuan": "CNY", "franc": "CHF", "baht": "THB",
+    "dirham": "AED", "peso": "MXN", "reais": "BRL",
+}
+# Also ordinary English words ("I won't", "a real local experience"): only counted after an amount
+AMOUNT_CURRENCY_NAMES = {"won": "KRW", "real": "BRL"}
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+CURRENCY_CODES = {"USD", "EUR", "GBP", "JPY", "INR", "CNY", "KRW", "CHF", "THB", "AED",
+                  "MXN", "BRL", "AUD", "CAD", "SGD", "HKD", "NZD", "SEK", "NOK", "DKK"}
+
+PREFERENCES = {
+    "local_food": r"local food|street food|authentic",
+    "vegetarian": r"vegetarian|vegan",
+    "public_transport": r"public transport|metro|subway|bus(?:es)?\b",
+    "walking": r"\bwalk",
+    "museums": r"museum|art|galler",
+    "nightlife": r"nightlife|bars?\b|clubs?\b",
+    "nature": r"nature|hiking|beach|park",
+    "shopping": r"shopping|markets?\b",
+    "family": r"family|kids|children",
+    "luxury": r"luxury|5[- ]star",
+}
+
+BUDGET_BANDS = ((60, "budget"), (150, "mid-range"), (300, "upscale"))
+# Whole-trip budgets are banded per day (stay, food, transport and activities)
+DAILY_BUDGET_BANDS = ((100, "budget"), (250, "mid-range"), (500, "upscale"))
+
+DATE_FORMATS = ("%d %B %Y", "%B %d %Y", "%d %b %Y", "%b %d %Y", "%Y-%m-%d", "%d/%m/%Y")
+
+AMOUNT = r"(?:[$€£¥₹]\s?\d[\d,]*(?:\.\d+)?|\d[\d,]*(?:\.\d+)?\s?[A-Z]{3}\b)"
+NIGHTLY_QUALIFIER = re.compile(r"^\s*(?:/|per|a|an|each)\s*night|^\s*nightly", re.IGNORECASE)
+TOTAL_QUALIFIER = re.compile(r"\b(?:total|overall|whole|entire|all[- ]in)\b[^$€£¥₹\d]{0,20}$", re.IGNORECASE)
+TOTAL_SUFFIX = re.compile(r"^\s*(?:in\s+)?(?:total|overall|all[- ]in|for the (?:whole|entire) trip)", re.IGNORECASE)
+
+class TripIntent:
+    """Normalized description of what a trip request asks for.
+
+    Parsed deterministically from the free-text request, so near-identical
+    requests map to the same :meth:`key`.
+    """
+
+    def __init__(self, destination: Optional[str] = None, start_date: Optional[date] = None,
+                 end_date: Optional[date] = None, days: Optional[int] = None,
+                 nightly_budget: Optional[float] = None, budget_currency: Optional[str] = None,
+                 currencies: Optional[List[str]] = None, preferences: Optional[List[str]] = None,
+                 total_budget: Optional[float] = None, month: Optional[str] = None):
+        self.destination = destination
+        self.start_date = start_date
+        self.end_date = end_date
+        self.days = days
+        self.nightly_budget = nightly_budget
+        self.budget_currency = budget_currency
+        self.currencies = sorted(set(currencies or []))
+        self.preferences = sorted(set(preferences or []))
+        self.total_budget = total_budget
+        self.month = month
+
+    @property
+    def budget_band(self) -> Optional[str]:
+        if self.nightly_budget is None:
+            return None
+        for limit, band in BUDGET_BANDS:
+            if self.nightly_budget < limit:
+                return band
+        return "luxury"
+
+    @property
+    def total_budget_band(self) -> Optional[str]:
+        """Band of the whole-trip budget per day, so near-identical totals share a key."""
+        if self.total_budget is None:
+            return None
+        per_day = self.total_budget / (self.days or 1)
+        for limit, band in DAILY_BUDGET_BANDS:
+            if per_day < limit:
+                return band
+        return "luxury"
+
+    @classmethod
+    def from_text(cls, text: str) -> "TripIntent":
+        """Parse a trip request.
+
+        Args:
+            text (str): The user's free-text request.
+
+        Returns:
+            TripIntent: Parsed intent; fields that cannot be found are None.
+        """
+        dates = _parse_dates(text)
+        start_date = dates[0] if dates else None
+        end_date = dates[1] if len(dates) > 1 else None
+
+        days = None
+        match = re.search(r"(\d+)[- ]?(?:day|days)\b", text, re.IGNORECASE)
+        weeks = re.search(r"\b(\d+|a|one)\s+weeks?\b", text, re.IGNORECASE)
+        if match:
+            days = int(match.group(1))
+        elif weeks:
+            days = 7 * (int(weeks.group(1)) if weeks.group(1).isdigit() else 1)
+        elif start_date and end_date:
+            days = (end_date - start_date).days + 1
+        if start_date and not end_date and days:
+            end_date = start_date + timedelta(days=days - 1)
+
+        nightly_budget, total_budget, budget_currency = _parse_budget(text)
+        return cls(
+            destination=_parse_destination(text),
+            start_date=start_date,
+            end_date=end_date,
+            days=days,
+            nightly_budget=nightly_budget,
+            budget_currency=budget_currency,
+            currencies=_parse_currencies(text),
+            preferences=[name for name, pattern in PREFERENCES.items()
+                         if re.search(pattern, text, re.IGNORECASE)],
+            total_budget=total_budget,
+            month=None if start_date else _parse_month(text),
+        )
+
+    def key(self) -> Optional[str]:
+        """Return a stable cache key, or None if no destination was found.
+
+        Dates are bucketed to their ISO week so similar date windows share a key;
+        requests that only name a month are keyed by that month.
+        """
+        if not self.destination:
+            return None
+        week = None
+        if self.start_date:
+            year, week_number, _ = self.start_date.isocalendar()
+            week = f"{year}-W{week_number:02d}"
+        parts = {
+            "destination": self.destination.lower(),
+            "week": week,
+            "days": self.days,
+            "budget_band": self.budget_band,
+            "currencies": self.currencies,
+            "preferences": self.preferences,
+        }
+        if self.month and not week:
+            parts["month"] = self.month
+        if self.total_budget_band:
+            parts["total_budget"] = f"{self.total_budget_band}:{self.budget_currency}"
+        return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def to_dict(self) -> dict:
+        return {
+            "destination": self.destination,
+            "start_date": self.start_date.isoformat() if self.start_date else None,
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "days": self.days,
+            "nightly_budget": self.nightly_budget,
+            "budget_currency": self.budget_currency,
+            "budget_band": self.budget_band,
+            "total_budget": self.total_budget,
+            "total_budget_band": self.total_budget_band,
+            "month": self.month,
+            "currencies": self.currencies,
+            "preferences": self.preferences,
+        }
+
+
+def _parse_destination(text: str) -> Optional[str]:
+    stop_words = set(MONTHS) | {"next", "this", "my", "the", "a", "an"}
+    for pattern in (r"\btrip to\s+([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*)",
+                    r"\b(?:travel(?:ling|ing)?|going|fly(?:ing)?|visit(?:ing)?)\s+(?:to\s+)?([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*)",
+                    r"\b(?:to|in)\s+([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*)"):
+        for match in re.finditer(pattern, text):
+            words = [w for w in match.group(1).split() if w.lower() not in stop_words]
+            if words and words[0] == match.group(1).split()[0]:
+                return " ".join(words)
+    return None
+
+def _parse_dates(text: str) -> List[date]:
+    candidates = re.findall(
+        r"\b(\d{1,2}(?:st|nd|rd|th)?\s+[A-Za-z]{3,9},?\s+\d{4}"
+        r"|[A-Za-z]{3,9}\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}"
+        r"|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4})\b",
+        text
+    )
+    dates = []
+    for candidate in candidates:
+        cleaned = re.sub(r"(\d)(st|nd|rd|th)", r"\1", candidate).replace(",", "")
+        for fmt in DATE_FORMATS:
+            try:
+                dates.append(datetime.strptime(cleaned, fmt).date())
+                break
+            except ValueError:
+                continue
+    return dates
+
+def _parse_month(text: str) -> Optional[str]:
+    """Return "YYYY-MM" for "March 2026", or "MM" for "in March", when no exact date is given."""
+    names = "|".join(MONTHS)
+    match = re.search(rf"\b({names})\s+(\d{{4}})\b", text, re.IGNORECASE)
+    if match:
+        return f"{match.group(2)}-{MONTHS.index(match.group(1).lower()) + 1:02d}"
+    match = re.search(rf"\b(?:in|during|early|mid|late|this|next)\s+({'|'.join(m.title() for m in MONTHS)})\b", text)
+    if match:
+        return f"{MONTHS.index(match.group(1).lower()) + 1:02d}"
+    return None
+
+def _parse_amount(amount: str):
+    match = re.match(r"([$€£¥₹])\s?(\d[\d,]*(?:\.\d+)?)", amount)
+    if match:
+        return float(match.group(2).replace(",", "")), CURRENCY_SYMBOLS[match.group(1)]
+    match = re.match(r"(\d[\d,]*(?:\.\d+)?)\s?([A-Z]{3})", amount)
+    if match.group(2) in CURRENCY_CODES:
+        return float(match.group(1).replace(",", "")), match.group(2)
+    return None, None
+
+def _parse_budget(text: str):
+    """Return ``(nightly, total, currency)``.
+
+    An amount followed by "per night" (or "/night", "nightly") is the nightly
+    budget and one qualified by "total", "overall" or "whole trip" is the trip total.
+    Without either qualifier the first amount is taken as nightly.
+    """
+    found = {}
+    for match in re.finditer(AMOUNT, text):
+        amount, code = _parse_amount(match.group(0))
+        if amount is None:
+            continue
+        if NIGHTLY_QUALIFIER.match(text[match.end():]):
+            found.setdefault("nightly", (amount, code))
+        elif TOTAL_QUALIFIER.search(text[:match.start()]) or TOTAL_SUFFIX.match(text[match.end():]):
+            found.setdefault("total", (amount, code))
+        else:
+            found.setdefault("unqualified", (amount, code))
+    if "nightly" not in found and "total" not in found and "unqualified" in found:
+        found["nightly"] = found["unqualified"]
+    nightly, nightly_currency = found.get("nightly", (None, None))
+    total, total_currency = found.get("total", (None, None))
+    return nightly, total, nightly_currency or total_currency
+
+def _parse_currencies(text: str) -> List[str]:
+    found = set(re.findall(r"\b([A-Z]{3})\b", text)) & CURRENCY_CODES
+    lowered = text.lower()
+    for name, code in CURRENCY_NAMES.items():
+        if re.search(rf"\b{name}s?\b", lowered):
+            found.add(code)
+    for name, code in AMOUNT_CURRENCY_NAMES.items():
+        if re.search(rf"\d\s?{name}s?\b", lowered):
+            found.add(code)
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            found.add(code)
+    return sorted(found)
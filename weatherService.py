@@ -1,11 +1,17 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from httpClient import HttpClient
+from forecastModel import CityForecast
 
 class WeatherService:
 
-    BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+    BASE_URL = "http://api.openweathermap.org/data/2.5"
+    MAX_PARALLEL_CITIES = 8
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, http_client: HttpClient = None):
         self.api_key = api_key
+        self.cache = cache
+        self.http = http_client or HttpClient()
 
     def get_current_weather(self, city)-> dict:
         """Get current weather for a city.
@@ -14,9 +20,14 @@ class WeatherService:
         Returns:
             dict: Current weather data or None if an error occurs.
         """
+        if self.cache is not None:
+            return self.cache.get_or_load("current_weather", lambda: self._fetch_current_weather(city), city)
+        return self._fetch_current_weather(city)
+
+    def _fetch_current_weather(self, city)-> dict:
         try:
             url = f"{self.BASE_URL}/weather?q={city}&appid={self.api_key}&units=metric"
-            response = requests.get(url)
+            response = self.http.get(url)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -32,12 +43,42 @@ class WeatherService:
         Returns:
             dict: Weather forecast data or None if an error occurs.
         """
+        if self.cache is not None:
+            return self.cache.get_or_load("weather_forecast", lambda: self._fetch_weather_forecast(city, days), city, days)
+        return self._fetch_weather_forecast(city, days)
+
+    def _fetch_weather_forecast(self, city, days=5)-> dict:
         try:
             url = f"{self.BASE_URL}/forecast?q={city}&appid={self.api_key}&units=metric&cnt={days * 8}"
-            response = requests.get(url)
+            response = self.http.get(url)
             if response.status_code == 200:
                 return response.json()
             else:
                 return None
         except Exception:
-            return None    
\ No newline at end of file
+            return None
+
+    def get_city_forecast(self, city, days=5) -> CityForecast:
+        """Get the parsed forecast for a city.
+        Args:
+            city (str): Name of the city.
+            days (int): Number of days for the forecast (default is 5).
+        Returns:
+            CityForecast: Array-backed forecast or None if an error occurs.
+        """
+        return CityForecast.from_response(city, self.get_weather_forecast(city, days))
+
+    def get_city_forecasts(self, cities: List[str], days=5) -> Dict[str, CityForecast]:
+        """Get forecasts for several cities of an itinerary in parallel.
+        Args:
+            cities (List[str]): City names.
+            days (int): Number of days for each forecast (default is 5).
+        Returns:
+            dict: City name to CityForecast, or None for cities that failed.
+        """
+        unique = list(dict.fromkeys(cities))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(len(unique), self.MAX_PARALLEL_CITIES)) as executor:
+            forecasts = executor.map(lambda city: self.get_city_forecast(city, days), unique)
+            return dict(zip(unique, forecasts))